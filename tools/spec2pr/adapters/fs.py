@@ -0,0 +1,33 @@
+"""Filesystem adapter - directory creation and atomic file writes shared by every stage."""
+
+import os
+import threading
+from pathlib import Path
+
+
+# Directories ensure_dir has already created, so repeat writes skip mkdir
+_created_dirs: set[Path] = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """Create a directory (and parents) unless this process already has."""
+    if path not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(path)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write data to a temp file beside path and rename it into place.
+
+    Readers, including other spec2pr processes, never see a partial file, and
+    a crash mid-write never leaves a truncated one behind.
+
+    Args:
+        path: File to write; its parent directory is created if needed
+        data: Full file contents
+    """
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -1,14 +1,76 @@
-"""GitHub API adapter using gh CLI."""
+"""GitHub adapter - REST/GraphQL API client plus gh and git CLI wrappers."""
 
+import functools
+import hashlib
 import json
+import os
+import shutil
 import subprocess
-from typing import Optional
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from adapters.fs import write_atomic
+
+
+API_HOST = "api.github.com"
+
+# Issue bodies cached on disk and revalidated with If-None-Match
+ISSUE_CACHE_DIR = Path(".spec2pr/cache/issues")
+
+# Extension-less names that are always text, never compiled binaries
+KNOWN_TEXT_FILES = frozenset({
+    "Makefile", "Dockerfile", "Vagrantfile", "Gemfile", "Rakefile",
+    "LICENSE", "README", "CHANGELOG", "AUTHORS", "CONTRIBUTING",
+})
+
+# Leading bytes of compiled executables: ELF, Mach-O (fat, 64/32-bit LE, BE), PE
+_BINARY_MAGICS = (
+    b"\x7fELF",
+    b"\xca\xfe\xba\xbe",
+    b"\xcf\xfa\xed\xfe",
+    b"\xce\xfa\xed\xfe",
+    b"\xfe\xed\xfa",
+    b"MZ",
+)
+
+# Leading bytes checked for a NUL, git's own test for binary content
+BINARY_SNIFF_BYTES = 8000
+
+# Bound on git commands that talk to the remote (fetch, push)
+GIT_NETWORK_TIMEOUT_SECONDS = 300
+
+# A `git fetch origin main` started this recently is reused rather than repeated
+MAIN_FETCH_TTL_SECONDS = 30
+
+# Methods safe to resend after the response was lost: repeating them has
+# no further effect on GitHub
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+# One keep-alive HTTPS connection per thread (http.client is not thread-safe)
+_local = threading.local()
+_token: Optional[str] = None
+
+# (start time, thread) of the latest background fetch of origin/main
+_main_fetch: Optional[tuple[float, "MainFetch"]] = None
+_main_fetch_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def gh_path() -> Optional[str]:
+    """Resolve the gh executable once per process."""
+    return shutil.which("gh")
 
 
 def run_gh(args: list[str], input_data: Optional[str] = None) -> str:
     """Run a gh CLI command and return stdout."""
+    # Absolute path skips the PATH search on every spawn
     result = subprocess.run(
-        ["gh"] + args,
+        [gh_path() or "gh"] + args,
         capture_output=True,
         text=True,
         input=input_data,
@@ -18,14 +80,169 @@ def run_gh(args: list[str], input_data: Optional[str] = None) -> str:
     return result.stdout
 
 
+def _get_token() -> str:
+    """Return the GitHub token from the environment, falling back to `gh auth token`."""
+    global _token
+    if _token is None:
+        _token = (
+            os.environ.get("GITHUB_TOKEN")
+            or os.environ.get("GH_TOKEN")
+            or run_gh(["auth", "token"]).strip()
+        )
+    return _token
+
+
+def _connection() -> "http.client.HTTPSConnection":
+    """Return this thread's persistent connection to the GitHub API."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        # Imported on first use: http.client pulls in ssl and email, which
+        # commands that never call the API (e.g. --status) shouldn't pay for
+        import http.client
+        conn = http.client.HTTPSConnection(API_HOST, timeout=60)
+        _local.conn = conn
+    return conn
+
+
+def _send(
+    method: str,
+    path: str,
+    body: Optional[dict] = None,
+    params: Optional[dict] = None,
+    extra_headers: Optional[dict] = None
+) -> tuple["http.client.HTTPResponse", bytes]:
+    """Send a GitHub API request and return (response, body bytes).
+
+    Raises:
+        RuntimeError: If the request fails or GitHub returns an error status
+    """
+    if params:
+        path = f"{path}?{urlencode(params)}"
+    headers = {
+        "Authorization": f"Bearer {_get_token()}",
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "spec2pr",
+        **(extra_headers or {}),
+    }
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+
+    import http.client  # lazy, see _connection
+
+    # Retry once on a fresh connection if the kept-alive one was dropped.
+    # Once the request has been sent, GitHub may have acted on it even though
+    # the response was lost, so only idempotent methods are resent then -
+    # retrying a POST could create a duplicate issue or PR
+    for attempt in range(2):
+        conn = _connection()
+        sent = False
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            sent = True
+            response = conn.getresponse()
+            data = response.read()
+            break
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            _local.conn = None
+            if attempt or (sent and method not in _IDEMPOTENT_METHODS):
+                raise RuntimeError(f"GitHub API {method} {path} failed: {e}") from e
+
+    if response.status >= 400:
+        raise RuntimeError(
+            f"GitHub API {method} {path} failed: {response.status} {data[:500].decode(errors='replace')}"
+        )
+    return response, data
+
+
+def api_request(
+    method: str,
+    path: str,
+    body: Optional[dict] = None,
+    params: Optional[dict] = None
+) -> Any:
+    """Call the GitHub API over a reused HTTPS connection and return parsed JSON.
+
+    Raises:
+        RuntimeError: If the request fails or GitHub returns an error status
+    """
+    _, data = _send(method, path, body, params)
+    return json.loads(data) if data else None
+
+
 def get_issue(repo: str, issue_number: int) -> dict:
-    """Fetch issue data from GitHub."""
-    output = run_gh([
-        "issue", "view", str(issue_number),
-        "--repo", repo,
-        "--json", "title,body,labels"
-    ])
-    return json.loads(output)
+    """Fetch issue data from GitHub.
+
+    The last response is cached under ISSUE_CACHE_DIR with its ETag. Reruns
+    send If-None-Match, and a 304 is served from the cache.
+    """
+    key = hashlib.sha256(f"{repo}/{issue_number}".encode()).hexdigest()
+    cache_path = ISSUE_CACHE_DIR / f"{key}.json"
+    etag_path = ISSUE_CACHE_DIR / f"{key}.etag"
+
+    headers = {}
+    if cache_path.exists() and etag_path.exists():
+        headers["If-None-Match"] = etag_path.read_text().strip()
+
+    response, data = _send("GET", f"/repos/{repo}/issues/{issue_number}", extra_headers=headers)
+    if response.status == 304:
+        return json.loads(cache_path.read_bytes())
+
+    raw = json.loads(data)
+    issue = {
+        "title": raw["title"],
+        "body": raw["body"],
+        "labels": [{"name": label["name"]} for label in raw.get("labels", [])],
+    }
+
+    etag = response.getheader("ETag")
+    if etag:
+        # Body first, ETag last: a crash in between leaves an ETag that no
+        # longer matches, so the next run refetches rather than trusting it
+        write_atomic(cache_path, json.dumps(issue).encode())
+        write_atomic(etag_path, etag.encode())
+    return issue
+
+
+def get_issues_batch(repo: str, issue_numbers: list[int]) -> dict[int, dict]:
+    """Fetch several issues in a single GraphQL request.
+
+    Returns a map of issue number to {title, body, labels}, shaped like
+    get_issue() output. Issues that could not be resolved are omitted so
+    callers can fall back to get_issue().
+    """
+    if not issue_numbers:
+        return {}
+
+    owner, name = repo.split("/", 1)
+    fields = "\n".join(
+        f"i{i}: issue(number: {n}) {{ title body labels(first: 20) {{ nodes {{ name }} }} }}"
+        for i, n in enumerate(issue_numbers)
+    )
+    query = f"""query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{
+{fields}
+  }}
+}}"""
+    response = api_request("POST", "/graphql", {
+        "query": query,
+        "variables": {"owner": owner, "name": name},
+    })
+    repository = (response.get("data") or {}).get("repository") or {}
+
+    issues = {}
+    for i, n in enumerate(issue_numbers):
+        node = repository.get(f"i{i}")
+        if not node:
+            continue
+        issues[n] = {
+            "title": node["title"],
+            "body": node["body"],
+            "labels": node["labels"]["nodes"],
+        }
+    return issues
 
 
 def create_issue(repo: str, title: str, body: str, labels: list[str] = None) -> Optional[str]:
@@ -33,32 +250,29 @@ def create_issue(repo: str, title: str, body: str, labels: list[str] = None) ->
 
     Returns None if issue creation fails (non-critical for failure reporting).
     """
-    args = ["issue", "create", "--repo", repo, "--title", title, "--body", body]
+    data = {"title": title, "body": body}
     if labels:
-        for label in labels:
-            args.extend(["--label", label])
+        data["labels"] = labels
     try:
-        output = run_gh(args)
-        return output.strip()
+        issue = api_request("POST", f"/repos/{repo}/issues", data)
+        return issue["html_url"]
     except RuntimeError as e:
         # Issue creation is non-critical - log and continue
-        import sys
         print(f"Warning: Could not create issue: {e}", file=sys.stderr)
         return None
 
 
 def get_pr_for_branch(repo: str, branch: str) -> Optional[str]:
     """Check if a PR exists for the given branch and return its URL."""
+    owner = repo.split("/", 1)[0]
     try:
-        output = run_gh([
-            "pr", "view", branch,
-            "--repo", repo,
-            "--json", "url"
-        ])
-        data = json.loads(output)
-        return data.get("url")
+        pulls = api_request("GET", f"/repos/{repo}/pulls", params={
+            "head": f"{owner}:{branch}",
+            "state": "open",
+        })
     except RuntimeError:
         return None
+    return pulls[0]["html_url"] if pulls else None
 
 
 def create_pr(
@@ -74,15 +288,13 @@ def create_pr(
     returns the existing PR URL (handles GitHub API race conditions).
     """
     try:
-        output = run_gh([
-            "pr", "create",
-            "--repo", repo,
-            "--head", branch,
-            "--base", base,
-            "--title", title,
-            "--body", body,
-        ])
-        return output.strip()
+        pr = api_request("POST", f"/repos/{repo}/pulls", {
+            "head": branch,
+            "base": base,
+            "title": title,
+            "body": body,
+        })
+        return pr["html_url"]
     except RuntimeError as e:
         # Check if PR was actually created despite the error
         existing_pr = get_pr_for_branch(repo, branch)
@@ -91,26 +303,222 @@ def create_pr(
         raise e
 
 
-def delete_branch_if_exists(branch_name: str) -> None:
+def add_worktree(path: str, cwd: Optional[str] = None) -> None:
+    """Create a detached git worktree at path, checked out at HEAD of cwd."""
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", path, "HEAD"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,  # Surfaced via CalledProcessError.stderr
+        cwd=cwd,
+    )
+
+
+def remove_worktree(path: str, cwd: Optional[str] = None) -> None:
+    """Remove a git worktree, discarding any uncommitted changes in it."""
+    subprocess.run(
+        ["git", "worktree", "remove", "--force", path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,  # Don't fail if worktree is already gone
+        cwd=cwd,
+    )
+
+
+def link_ignored_paths(source: Optional[str], dest: str) -> None:
+    """Make the gitignored files of source (dependencies, build output) visible in worktree dest.
+
+    A new worktree only has tracked files, so e.g. node_modules/ or .venv/
+    would be missing when done_when commands run there. Ignored files are
+    symlinked. Ignored directories are recreated as real directories whose
+    entries are symlinked, so directory-only patterns such as "node_modules/"
+    still match and the links never show up as changes.
+
+    Args:
+        source: Root of the working tree to link from (defaults to current dir)
+        dest: Root of the new worktree
+    """
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--others", "--ignored", "--exclude-standard", "--directory"],
+        capture_output=True,
+        check=True,
+        cwd=source,
+    )
+    source_root = os.path.abspath(source or ".")
+    for entry in os.fsdecode(result.stdout).split("\0"):
+        # .spec2pr holds the worktrees themselves
+        if not entry or entry.split("/", 1)[0] == ".spec2pr":
+            continue
+        path = entry.rstrip("/")
+        src = os.path.join(source_root, path)
+        dst = os.path.join(dest, path)
+        if os.path.lexists(dst):
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if entry.endswith("/"):
+            os.mkdir(dst)
+            with os.scandir(src) as it:
+                for child in it:
+                    os.symlink(child.path, os.path.join(dst, child.name))
+        else:
+            os.symlink(src, dst)
+
+
+def snapshot_changes(cwd: Optional[str] = None, paths: Optional[list[str]] = None) -> bytes:
+    """Return a binary patch of working-tree changes against HEAD.
+
+    Untracked (non-ignored) files are included. A throwaway index is used so
+    the real index is left untouched.
+
+    Args:
+        cwd: Working tree to snapshot (defaults to current dir)
+        paths: Pathspecs to limit the snapshot to (None for everything)
+    """
+    if paths is not None and not paths:
+        return b""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _stage_working_tree(os.path.join(tmp, "index"), cwd)
+        # Pathspecs go on the diff, where ones matching nothing are not an error
+        result = subprocess.run(
+            ["git", "diff", "--cached", "--binary", "HEAD", "--"] + (paths or []),
+            check=True,
+            capture_output=True,
+            env=env,
+            cwd=cwd,
+        )
+    return result.stdout
+
+
+def _stage_working_tree(index_path: str, cwd: Optional[str] = None) -> dict:
+    """Stage all of cwd outside .spec2pr into the index at index_path.
+
+    The throwaway index starts as a copy of the real one rather than a bare
+    `read-tree HEAD`, so `git add` can trust the cached stat data and only
+    rehash files that actually changed.
+
+    Returns:
+        Environment for git commands that should use the throwaway index
+    """
+    env = {**os.environ, "GIT_INDEX_FILE": index_path}
+    real_index = subprocess.run(
+        ["git", "rev-parse", "--git-path", "index"],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    ).stdout.strip()
+    try:
+        shutil.copyfile(os.path.join(cwd or ".", real_index), index_path)
+    except FileNotFoundError:
+        # No index yet (nothing ever staged): start from HEAD
+        subprocess.run(["git", "read-tree", "HEAD"], check=True, env=env, cwd=cwd)
+
+    _add_all_but_spec2pr(cwd, env)
+    return env
+
+
+def _add_all_but_spec2pr(cwd: Optional[str] = None, env: Optional[dict] = None) -> None:
+    """Stage every change except the .spec2pr directory."""
+    # git add refuses an exclude pathspec naming an ignored path, and an
+    # ignored .spec2pr is skipped anyway
+    ignored = subprocess.run(["git", "check-ignore", "-q", ".spec2pr/"], cwd=cwd).returncode == 0
+    subprocess.run(
+        ["git", "add", "-A"] + ([] if ignored else [":(exclude).spec2pr"]),
+        check=True,
+        env=env,
+        cwd=cwd,
+    )
+
+
+def working_tree_hash(cwd: Optional[str] = None) -> str:
+    """Return the git tree hash of the working tree, untracked files included.
+
+    Like snapshot_changes(), this stages into a throwaway index, leaving the
+    real index untouched. Two working trees with the same content (outside
+    .spec2pr) get the same hash.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _stage_working_tree(os.path.join(tmp, "index"), cwd)
+        result = subprocess.run(
+            ["git", "write-tree"],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=cwd,
+        )
+    return result.stdout.strip()
+
+
+def apply_patch(patch: bytes, cwd: Optional[str] = None) -> bool:
+    """Apply a patch from snapshot_changes() to the working tree.
+
+    Returns:
+        True if the patch applied cleanly (or was empty), False otherwise.
+    """
+    if not patch:
+        return True
+    result = subprocess.run(
+        ["git", "apply", "--binary", "-"],
+        input=patch,
+        capture_output=True,
+        cwd=cwd,
+    )
+    return result.returncode == 0
+
+
+def commit_all(message: str, cwd: Optional[str] = None) -> None:
+    """Commit every change in a private worktree under a fixed pipeline identity."""
+    subprocess.run(["git", "add", "-A"], check=True, cwd=cwd)
+    subprocess.run(
+        [
+            "git",
+            "-c", "user.name=spec2pr",
+            "-c", "user.email=spec2pr@localhost",
+            "commit", "--quiet", "--no-verify", "--allow-empty", "-m", message,
+        ],
+        check=True,
+        cwd=cwd,
+    )
+
+
+def delete_branch_if_exists(branch_name: str, cwd: Optional[str] = None) -> None:
     """Delete local and remote branch if they exist."""
     # Delete local branch if exists
     subprocess.run(
         ["git", "branch", "-D", branch_name],
-        capture_output=True,  # Don't fail if branch doesn't exist
-    )
-    # Delete remote branch if exists
-    subprocess.run(
-        ["git", "push", "origin", "--delete", branch_name],
-        capture_output=True,  # Don't fail if branch doesn't exist
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,  # Don't fail if branch doesn't exist
+        cwd=cwd,
     )
+    # Delete remote branch if exists (don't fail if it doesn't)
+    delete_remote_branch(branch_name, cwd)
 
 
-def create_branch(branch_name: str) -> None:
-    """Create and checkout a new branch."""
-    subprocess.run(["git", "checkout", "-b", branch_name], check=True)
+def create_branch(branch_name: str, cwd: Optional[str] = None, reset: bool = False) -> None:
+    """Create and checkout a new branch.
 
+    With reset, an existing local branch of that name is reset to the current
+    commit instead of failing, replacing a separate `git branch -D`.
+    """
+    subprocess.run(["git", "checkout", "-B" if reset else "-b", branch_name], check=True, cwd=cwd)
 
-def commit_changes(message: str) -> bool:
+
+def is_compiled_binary(path: str, cwd: Optional[str] = None) -> bool:
+    """Check whether a file is binary: it starts with an executable magic
+    number, or its first block contains a NUL byte as git's own check does.
+
+    Missing or unreadable files (e.g. staged deletions) are not binaries.
+    """
+    try:
+        with open(os.path.join(cwd or ".", path), "rb") as f:
+            head = f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return False
+    return head.startswith(_BINARY_MAGICS) or b"\0" in head
+
+
+def commit_changes(message: str, cwd: Optional[str] = None) -> list[str]:
     """Stage all changes and commit.
 
     Excludes:
@@ -118,10 +526,10 @@ def commit_changes(message: str) -> bool:
     - Compiled binaries (files without extensions that are executable)
 
     Returns:
-        True if changes were committed, False if nothing to commit.
+        Paths of the committed files (empty if there was nothing to commit).
     """
     # Add all changes except .spec2pr directory
-    subprocess.run(["git", "add", "-A", ":(exclude).spec2pr"], check=True)
+    _add_all_but_spec2pr(cwd)
 
     # Unstage any binary files (compiled executables)
     # These are typically files without extensions that got compiled
@@ -129,65 +537,154 @@ def commit_changes(message: str) -> bool:
         ["git", "diff", "--cached", "--name-only"],
         capture_output=True,
         text=True,
+        cwd=cwd,
     )
     staged_files = [f for f in result.stdout.strip().split("\n") if f]
 
+    # Files without extensions might be binaries
+    # (but keep files like Makefile, Dockerfile, etc.)
+    candidates = []
     for filename in staged_files:
-        # Skip files without extensions that might be binaries
-        # (but keep files like Makefile, Dockerfile, etc.)
-        if "." not in filename.split("/")[-1] and filename not in [
-            "Makefile", "Dockerfile", "Vagrantfile", "Gemfile", "Rakefile",
-            "LICENSE", "README", "CHANGELOG", "AUTHORS", "CONTRIBUTING"
-        ]:
-            # Check if it's a binary file
-            check = subprocess.run(
-                ["file", "--mime", filename],
-                capture_output=True,
+        basename = os.path.basename(filename)
+        if "." not in basename and basename not in KNOWN_TEXT_FILES:
+            candidates.append(filename)
+
+    if candidates:
+        binaries = {f for f in candidates if is_compiled_binary(f, cwd)}
+        if binaries:
+            subprocess.run(
+                ["git", "reset", "HEAD", "--"] + sorted(binaries),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                cwd=cwd,
+            )
+            # What remains staged is known without re-reading the index
+            staged_files = [f for f in staged_files if f not in binaries]
+
+    if not staged_files:
+        return []  # Nothing to commit
+
+    subprocess.run(["git", "commit", "-m", message], check=True, cwd=cwd)
+    return staged_files
+
+
+class MainFetch(threading.Thread):
+    """Background `git fetch origin main` that records why it failed, if it did."""
+
+    def __init__(self, cwd: Optional[str] = None):
+        super().__init__(daemon=True)
+        self.cwd = cwd
+        # None once the fetch has succeeded
+        self.error: Optional[str] = None
+
+    def run(self) -> None:
+        try:
+            result = subprocess.run(
+                ["git", "fetch", "origin", "main"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
+                timeout=GIT_NETWORK_TIMEOUT_SECONDS,
+                cwd=self.cwd,
             )
-            if "executable" in check.stdout or "binary" in check.stdout:
-                subprocess.run(["git", "reset", "HEAD", filename], capture_output=True)
+        except subprocess.TimeoutExpired:
+            self.error = f"timed out after {GIT_NETWORK_TIMEOUT_SECONDS}s"
+            return
+        if result.returncode != 0:
+            # git's first line says what went wrong; the rest is boilerplate advice
+            self.error = next(iter(result.stderr.strip().splitlines()), f"exit code {result.returncode}")
 
-    # Check if there are still staged changes
-    result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only"],
-        capture_output=True,
-        text=True,
-    )
-    if not result.stdout.strip():
-        return False  # Nothing to commit
 
-    subprocess.run(["git", "commit", "-m", message], check=True)
-    return True
+def prefetch_main(cwd: Optional[str] = None) -> MainFetch:
+    """Start `git fetch origin main` in the background.
+
+    Pass the returned thread to rebase_on_main() so the fetch overlaps with
+    task execution instead of sitting on the publish critical path.
+
+    Worktrees share remote-tracking refs, so a fetch started less than
+    MAIN_FETCH_TTL_SECONDS ago (e.g. for another issue in the same batch)
+    is returned instead of starting another, unless it has already failed.
+    """
+    global _main_fetch
 
+    with _main_fetch_lock:
+        if _main_fetch is not None and time.monotonic() - _main_fetch[0] < MAIN_FETCH_TTL_SECONDS:
+            thread = _main_fetch[1]
+            if thread.is_alive() or thread.error is None:
+                return thread
 
-def rebase_on_main() -> bool:
+        thread = MainFetch(cwd)
+        thread.start()
+        _main_fetch = (time.monotonic(), thread)
+    return thread
+
+
+def _run_remote_quietly(cmd: list[str], cwd: Optional[str] = None) -> None:
+    """Run a best-effort git command against the remote, discarding output, failures and timeouts."""
+    try:
+        subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=GIT_NETWORK_TIMEOUT_SECONDS,
+            cwd=cwd,
+        )
+    except subprocess.TimeoutExpired:
+        pass
+
+
+def delete_remote_branch(branch_name: str, cwd: Optional[str] = None) -> None:
+    """Delete branch_name on origin, leaving any local branch alone.
+
+    A missing remote branch is not an error.
+    """
+    _run_remote_quietly(["git", "push", "origin", "--delete", branch_name], cwd)
+
+
+def rebase_on_main(cwd: Optional[str] = None, prefetch: Optional[MainFetch] = None) -> bool:
     """Fetch latest main and rebase current branch on it.
 
+    Args:
+        cwd: Working tree to rebase (defaults to current dir)
+        prefetch: Thread from prefetch_main(); if given, waits for it instead of fetching
+
     Returns:
         True if rebase succeeded, False if conflicts occurred.
     """
-    # Fetch latest main
-    subprocess.run(["git", "fetch", "origin", "main"], check=True)
-
-    # Attempt rebase
+    # Fetch latest main (or wait for the background fetch, reusing a recent one)
+    if prefetch is None:
+        prefetch = prefetch_main(cwd)
+    prefetch.join()
+    if prefetch.error:
+        print(
+            f"Warning: git fetch origin main failed ({prefetch.error}); rebasing on a possibly stale origin/main",
+            file=sys.stderr,
+        )
+
+    # Attempt rebase (only the exit code matters, so output is discarded)
     result = subprocess.run(
         ["git", "rebase", "origin/main"],
-        capture_output=True,
-        text=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
     )
 
     if result.returncode != 0:
         # Rebase failed (conflicts) - abort and return False
-        subprocess.run(["git", "rebase", "--abort"], capture_output=True)
+        subprocess.run(
+            ["git", "rebase", "--abort"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+        )
         return False
 
     return True
 
 
-def push_branch(branch_name: str, force: bool = False) -> None:
+def push_branch(branch_name: str, force: bool = False, cwd: Optional[str] = None) -> None:
     """Push branch to origin."""
     cmd = ["git", "push", "-u", "origin", branch_name]
     if force:
         cmd.insert(2, "--force-with-lease")
-    subprocess.run(cmd, check=True)
+    subprocess.run(cmd, check=True, timeout=GIT_NETWORK_TIMEOUT_SECONDS, cwd=cwd)
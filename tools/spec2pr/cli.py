@@ -8,8 +8,10 @@ Usage:
 """
 
 import argparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
+import functools
 import json
 import os
 import shutil
@@ -19,28 +21,81 @@ from pathlib import Path
 import threading
 import time
 
+from adapters.fs import ensure_dir, write_atomic
+from adapters.github import (
+    get_issues_batch,
+    add_worktree,
+    link_ignored_paths,
+    remove_worktree,
+    snapshot_changes,
+    apply_patch,
+    commit_all,
+    gh_path,
+    prefetch_main,
+)
 from stages.load_spec import load_spec
 from stages.plan_tasks import plan_tasks, build_dependency_graph
 from stages.run_task import run_task
-from stages.code_review import run_code_review
+from stages.code_review import run_code_review_batch
 from stages.verify import verify
 from stages.judge import judge
 from stages.publish import publish_pr, publish_issue, publish_combined_pr
 
 __version__ = "0.1.0"
 
+WORKTREES_DIR = Path(".spec2pr/worktrees")
+
+VALID_VERDICTS = frozenset({"accept", "reject"})
+
+# Most failure issues created concurrently when publishing
+PUBLISH_ISSUE_WORKERS = 4
+
+# Serializes progress output from concurrently running tasks
+_print_lock = threading.Lock()
 
 def write_json(path: Path, data: dict) -> None:
     """Write JSON data to file with pretty formatting."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    # Serialize up front and write once; json.dump issues a write per chunk
+    write_atomic(path, json.dumps(data, indent=2).encode())
+
+
+def log(message: str, file=None) -> None:
+    """Print a line of progress output without interleaving with other threads."""
+    stream = file or sys.stdout
+    with _print_lock:
+        stream.write(message + "\n")
+        stream.flush()
 
 
 def read_json(path: Path) -> dict:
     """Read JSON data from file."""
-    with open(path) as f:
-        return json.load(f)
+    return json.loads(path.read_bytes())
+
+
+@functools.lru_cache(maxsize=None)
+def claude_path() -> str | None:
+    """Resolve the claude executable once per process."""
+    return shutil.which("claude")
+
+
+@functools.lru_cache(maxsize=None)
+def git_user_name() -> str:
+    """Return the configured git user.name (empty if unset), read once per process."""
+    result = subprocess.run(
+        ["git", "config", "user.name"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def ci_script_status() -> tuple[bool, bool]:
+    """Return (exists, executable) for ci.sh using a single stat call."""
+    try:
+        st = os.stat("ci.sh")
+    except FileNotFoundError:
+        return False, False
+    return True, bool(st.st_mode & 0o111)
 
 
 def check_status() -> tuple[dict, int]:
@@ -53,16 +108,21 @@ def check_status() -> tuple[dict, int]:
     }
     exit_code = 0
 
-    # Check gh CLI
-    if shutil.which("gh"):
+    # Check gh CLI; it only supplies the GitHub token, so a token in the
+    # environment makes it optional
+    github_token_var = next((var for var in ("GITHUB_TOKEN", "GH_TOKEN") if os.environ.get(var)), None)
+    if gh_path():
         status["gh_cli"]["ok"] = True
         status["gh_cli"]["message"] = "gh CLI found"
+    elif github_token_var:
+        status["gh_cli"]["ok"] = True
+        status["gh_cli"]["message"] = f"gh CLI not found (not needed, {github_token_var} is set)"
     else:
-        status["gh_cli"]["message"] = "gh CLI not found. Install from https://cli.github.com/"
+        status["gh_cli"]["message"] = "gh CLI not found and neither GITHUB_TOKEN nor GH_TOKEN is set. Install from https://cli.github.com/"
         exit_code = 1
 
     # Check claude CLI
-    if shutil.which("claude"):
+    if claude_path():
         status["claude_cli"]["ok"] = True
         status["claude_cli"]["message"] = "claude CLI found"
     else:
@@ -81,16 +141,16 @@ def check_status() -> tuple[dict, int]:
         exit_code = 1
 
     # Check for ci.sh
-    ci_script = Path("ci.sh")
-    if ci_script.exists():
-        if os.access(ci_script, os.X_OK):
+    ci_exists, ci_executable = ci_script_status()
+    if ci_exists:
+        if ci_executable:
             status["ci_script"]["ok"] = True
             status["ci_script"]["message"] = "ci.sh found and executable"
         else:
             status["ci_script"]["message"] = "ci.sh found but not executable. Run: chmod +x ci.sh"
             exit_code = 1
     else:
-        status["ci_script"]["message"] = "ci.sh not found"
+        status["ci_script"]["message"] = "ci.sh not found - task verification may be limited"
         exit_code = 1
 
     return status, exit_code
@@ -98,103 +158,137 @@ def check_status() -> tuple[dict, int]:
 
 def validate_setup() -> list[str]:
     """Validate that the environment is properly configured. Returns list of errors."""
-    errors = []
-
-    # Check for required tools
-    if not shutil.which("gh"):
-        errors.append("gh CLI not found. Install from https://cli.github.com/")
-
-    if not shutil.which("claude"):
-        errors.append("claude CLI not found. Install with: npm install -g @anthropic-ai/claude-code")
+    # Same probes as --status, so PATH and the environment are checked once
+    status, _ = check_status()
 
-    # Check for API key or OAuth token
-    if not os.environ.get("ANTHROPIC_API_KEY") and not os.environ.get("CLAUDE_CODE_OAUTH_TOKEN"):
-        errors.append("Neither ANTHROPIC_API_KEY nor CLAUDE_CODE_OAUTH_TOKEN is set")
+    # Required tools and auth
+    errors = [
+        status[component]["message"]
+        for component in ("gh_cli", "claude_cli", "auth_token")
+        if not status[component]["ok"]
+    ]
 
-    # Check for ci.sh (optional - warn but don't fail)
-    ci_script = Path("ci.sh")
-    if not ci_script.exists():
-        print("Warning: ci.sh not found - task verification may be limited", file=sys.stderr)
-    elif not os.access(ci_script, os.X_OK):
-        print("Warning: ci.sh is not executable. Run: chmod +x ci.sh", file=sys.stderr)
+    # ci.sh is optional - warn but don't fail
+    if not status["ci_script"]["ok"]:
+        print(f"Warning: {status['ci_script']['message']}", file=sys.stderr)
 
     # Check git config
-    result = subprocess.run(
-        ["git", "config", "user.name"],
-        capture_output=True,
-        text=True,
-    )
-    if not result.stdout.strip():
+    if not git_user_name():
         errors.append("git user.name not configured")
 
     return errors
 
 
+def _create_task_worktree(task: dict, artifacts_dir: Path, cwd: str | None) -> str:
+    """
+    Create a private worktree for a task, seeded with the current state of cwd.
+
+    Changes already merged into cwd (e.g. from dependency tasks) are copied in
+    and committed as the worktree's base, so the task's own changes can later
+    be diffed against it. Ignored files (installed dependencies, build output)
+    are linked in from cwd, so done_when commands find them as they would in
+    cwd itself. If seeding fails, the worktree is removed again.
+    """
+    path = str((WORKTREES_DIR / f"issue-{artifacts_dir.name}-{task['id']}").resolve())
+    remove_worktree(path, cwd)
+    add_worktree(path, cwd)
+    try:
+        link_ignored_paths(cwd, path)
+        if not apply_patch(snapshot_changes(cwd), path):
+            raise RuntimeError(f"Could not copy working tree state into {path}")
+        commit_all(f"spec2pr: base for task {task['id']}", path)
+    except BaseException:
+        remove_worktree(path, cwd)
+        raise
+    return path
+
+
 def execute_task_with_stages(
     task: dict,
     artifacts_dir: Path,
-    task_lock: threading.Lock
-) -> tuple[dict, dict, dict, dict]:
+    task_lock: threading.Lock,
+    cwd: str | None = None
+) -> tuple[dict, dict, dict, dict, str]:
     """
-    Execute a single task including run, review, verify, and judge stages.
+    Execute a single task including run, verify, and judge stages.
+
+    The task runs in its own git worktree, so several tasks can run at once.
+    If accepted, its changes (limited to files_allowlist) are merged back
+    into cwd.
 
     Args:
         task: Task dict
         artifacts_dir: Base artifacts directory
-        task_lock: Thread lock for serializing git operations
+        task_lock: Thread lock for serializing git operations on cwd
+        cwd: Working tree to merge accepted changes into (defaults to current dir)
 
     Returns:
-        Tuple of (task, result, verify_result, judgment)
+        Tuple of (task, result, verify_result, judgment, diff), where diff is
+        the task's allowlisted changes, for code review
     """
     task_dir = artifacts_dir / task["id"]
-    task_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"\n[3/6] Running task {task['id']}: {task['title']}...")
+    # Only allowlisted changes are merged back, so without an allowlist an
+    # accepted task would silently contribute nothing
+    if not task.get("files_allowlist"):
+        judgment = {
+            "judge_id": "allowlist",
+            "verdict": "reject",
+            "confidence": "high",
+            "rationale": "Task has no files_allowlist, so none of its changes could be merged",
+            "blocking_issues": ["Task has an empty files_allowlist"],
+        }
+        write_json(task_dir / "judgment.json", judgment)
+        log(f"  ✗ Task {task['id']} rejected: empty files_allowlist")
+        return task, {}, {}, judgment, ""
 
-    # Run task execution (may modify files)
     with task_lock:
-        result = run_task(task)
-        write_json(task_dir / "result.json", result)
+        task_cwd = _create_task_worktree(task, artifacts_dir, cwd)
+
+    try:
+        return _run_task_stages(task, task_dir, task_lock, task_cwd, cwd)
+    finally:
+        with task_lock:
+            remove_worktree(task_cwd, cwd)
+
+
+def _run_task_stages(
+    task: dict,
+    task_dir: Path,
+    task_lock: threading.Lock,
+    task_cwd: str,
+    cwd: str | None
+) -> tuple[dict, dict, dict, dict, str]:
+    """Run, verify and judge a task in task_cwd, merging into cwd if accepted."""
+    log(f"\n[3/7] Running task {task['id']}: {task['title']}...")
+
+    # Run task execution (may modify files)
+    result = run_task(task, task_cwd, task_dir)
+    write_json(task_dir / "result.json", result)
 
     # Log retry information
     attempts = result.get("attempts", [])
     if len(attempts) > 1:
-        print(f"  Completed after {len(attempts)} attempt(s), final model: {result.get('model', 'unknown')}")
+        log(f"  Completed after {len(attempts)} attempt(s), final model: {result.get('model', 'unknown')}")
     if not result.get("success", True):
-        print(f"  Warning: All attempts failed", file=sys.stderr)
+        log(f"  Warning: All attempts failed", file=sys.stderr)
 
-    print(f"[4/6] Reviewing code changes for task {task['id']}...")
-    # Get git diff after task execution
-    with task_lock:
-        diff_result = subprocess.run(
-            ["git", "diff", "--cached"],
-            capture_output=True,
-            text=True,
-        )
-    diff = diff_result.stdout
-    review_result = run_code_review(task, diff)
-    write_json(task_dir / "review.json", review_result)
-
-    # Log review verdict
-    review_verdict = review_result.get("feedback", {}).get("verdict", "unknown")
-    if review_verdict == "approve":
-        print(f"  ✓ Code review approved")
-    else:
-        print(f"  ⚠ Code review requested changes")
+    # Snapshot the task's changes once: the same patch is merged into the
+    # shared tree if the task is accepted, and reviewed once all tasks are done
+    patch = snapshot_changes(task_cwd, task.get("files_allowlist", []))
+    diff = patch.decode(errors="replace")
 
-    print(f"[5/6] Verifying task {task['id']}...")
-    with task_lock:
-        verify_result = verify(task)
-        write_json(task_dir / "verify.json", verify_result)
+    log(f"[5/7] Verifying task {task['id']}...")
+    verify_result = verify(task, task_cwd, task_dir)
+    write_json(task_dir / "verify.json", verify_result)
 
-    print(f"[6/6] Judging task {task['id']}...")
-    judgment = judge(task, result, verify_result)
-    write_json(task_dir / "judgment.json", judgment)
+    log(f"[6/7] Judging task {task['id']}...")
+    judgment = judge(task, result, verify_result, task_cwd)
 
     # Validate judgment has required fields
     verdict = judgment.get("verdict")
-    if verdict not in ("accept", "reject"):
-        print(f"  Warning: Invalid judgment (verdict={verdict}), treating as reject", file=sys.stderr)
+    if verdict not in VALID_VERDICTS:
+        log(f"  Warning: Invalid judgment (verdict={verdict}), treating as reject", file=sys.stderr)
         judgment["verdict"] = "reject"
         judgment["blocking_issues"] = judgment.get("blocking_issues", []) + [
             f"Judge returned invalid verdict: {verdict}"
@@ -202,17 +296,115 @@ def execute_task_with_stages(
         verdict = "reject"
 
     if verdict == "accept":
-        print(f"  ✓ Task accepted")
+        # Merge the task's allowlisted changes back into the shared tree
+        with task_lock:
+            merged = apply_patch(patch, cwd)
+        if not merged:
+            judgment["verdict"] = "reject"
+            judgment["blocking_issues"] = judgment.get("blocking_issues", []) + [
+                "Changes conflict with another task's changes"
+            ]
+            verdict = "reject"
+
+    write_json(task_dir / "judgment.json", judgment)
+
+    if verdict == "accept":
+        log(f"  ✓ Task accepted")
     else:
-        print(f"  ✗ Task rejected: {judgment.get('rationale', 'unknown reason')[:100]}")
+        log(f"  ✗ Task rejected: {judgment.get('rationale', 'unknown reason')[:100]}")
+
+    return task, result, verify_result, judgment, diff
 
-    return task, result, verify_result, judgment
+
+def review_tasks(executed: list[dict], artifacts_dir: Path, cwd: str | None = None) -> None:
+    """
+    Review the changes of every executed task with one batched reviewer call.
+
+    This runs after every task has finished and its worktree is gone. Each
+    task is reviewed against its own diff, but any file the reviewer opens
+    shows the merged state of cwd: all accepted tasks' changes combined,
+    and none of a rejected task's.
+
+    Args:
+        executed: Accepted/rejected task entries carrying a "diff"
+        artifacts_dir: Artifacts directory for storing results
+        cwd: Working tree the reviewer reads files from (defaults to current dir)
+    """
+    reviews = run_code_review_batch([(item["task"], item["diff"]) for item in executed], cwd)
+    for review in reviews:
+        task_id = review["task"]["id"]
+        write_json(artifacts_dir / task_id / "review.json", review)
+        if review["feedback"].get("verdict") == "approve":
+            log(f"  ✓ Code review approved for {task_id}")
+        else:
+            log(f"  ⚠ Code review requested changes for {task_id}")
+
+
+def _skipped_task(task: dict) -> dict:
+    """Build the rejected-task entry for a task whose dependency failed."""
+    log(f"  Skipping {task['id']} - dependency failed")
+    return {
+        "task": task,
+        "judgment": {
+            "verdict": "reject",
+            "rationale": "Skipped due to failed dependency",
+            "blocking_issues": ["Dependency task failed"]
+        }
+    }
+
+
+def _is_linear(tasks: list[dict]) -> bool:
+    """Check whether the task DAG is a single chain (each task depends on the previous one)."""
+    deps = [task.get("depends_on", []) for task in tasks]
+    if any(len(d) > 1 for d in deps):
+        return False
+    return len({d[0] for d in deps if d}) == len(tasks) - 1
+
+
+def execute_tasks_serial(
+    tasks: list[dict],
+    artifacts_dir: Path,
+    cwd: str | None = None
+) -> tuple[list[dict], list[dict]]:
+    """
+    Execute tasks one at a time, in order, without a thread pool.
+
+    Args:
+        tasks: List of tasks (already sorted in dependency order)
+        artifacts_dir: Artifacts directory for storing results
+        cwd: Working tree to run tasks in (defaults to current dir)
+
+    Returns:
+        Tuple of (accepted_tasks, rejected_tasks)
+    """
+    accepted_tasks = []
+    rejected_tasks = []
+    task_lock = threading.Lock()
+    failed = set()
+
+    for task in tasks:
+        if any(dep_id in failed for dep_id in task.get("depends_on", [])):
+            rejected_tasks.append(_skipped_task(task))
+            failed.add(task["id"])
+            continue
+
+        task_obj, result, verify_result, judgment, diff = execute_task_with_stages(
+            task, artifacts_dir, task_lock, cwd
+        )
+        if judgment["verdict"] == "accept":
+            accepted_tasks.append({"task": task_obj, "result": result, "verify": verify_result, "diff": diff})
+        else:
+            rejected_tasks.append({"task": task_obj, "judgment": judgment, "diff": diff})
+            failed.add(task_obj["id"])
+
+    return accepted_tasks, rejected_tasks
 
 
 def execute_tasks_parallel(
     tasks: list[dict],
     artifacts_dir: Path,
-    max_workers: int = 4
+    max_workers: int = 4,
+    cwd: str | None = None
 ) -> tuple[list[dict], list[dict]]:
     """
     Execute tasks in parallel while respecting dependency order.
@@ -221,90 +413,75 @@ def execute_tasks_parallel(
         tasks: List of tasks (already sorted in dependency order)
         artifacts_dir: Artifacts directory for storing results
         max_workers: Maximum number of parallel workers
+        cwd: Working tree to run tasks in (defaults to current dir)
 
     Returns:
         Tuple of (accepted_tasks, rejected_tasks)
     """
+    # Nothing can overlap on a single worker or a chain - skip the pool
+    if max_workers == 1 or _is_linear(tasks):
+        return execute_tasks_serial(tasks, artifacts_dir, cwd)
+
     accepted_tasks = []
     rejected_tasks = []
     task_lock = threading.Lock()
 
-    # Build dependency map for quick lookup
+    # Reverse dependency index and count of unfinished deps per task, so each
+    # completion only touches the tasks that depend on it
     task_map = {task["id"]: task for task in tasks}
-    completed = set()
-    failed = set()
-
-    # Group tasks by dependency level
-    ready_queue = []
-    waiting = []
-
+    dependents = defaultdict(list)
+    pending_count = {}
     for task in tasks:
         deps = task.get("depends_on", [])
-        if not deps:
-            ready_queue.append(task)
-        else:
-            waiting.append(task)
+        pending_count[task["id"]] = len(deps)
+        for dep_id in deps:
+            dependents[dep_id].append(task["id"])
+    skipped = set()
+
+    def skip_dependents(task_id: str) -> None:
+        """Reject every task that transitively depends on a failed task."""
+        stack = list(dependents[task_id])
+        while stack:
+            dep_id = stack.pop()
+            if dep_id in skipped:
+                continue
+            skipped.add(dep_id)
+            rejected_tasks.append(_skipped_task(task_map[dep_id]))
+            stack.extend(dependents[dep_id])
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {}
 
         # Submit initial ready tasks
-        for task in ready_queue:
-            future = executor.submit(execute_task_with_stages, task, artifacts_dir, task_lock)
-            futures[future] = task
+        for task in tasks:
+            if pending_count[task["id"]] == 0:
+                future = executor.submit(execute_task_with_stages, task, artifacts_dir, task_lock, cwd)
+                futures[future] = task
 
         # Process completed tasks and submit new ones
         while futures:
-            # Wait for next completed future
-            done_futures = []
-            for future in as_completed(futures):
-                done_futures.append(future)
-                break  # Process one at a time to update waiting queue
+            # Wait for at least one future to complete
+            done_futures, _ = wait(futures, return_when=FIRST_COMPLETED)
 
             for future in done_futures:
                 task = futures.pop(future)
-                task_obj, result, verify_result, judgment = future.result()
+                task_obj, result, verify_result, judgment, diff = future.result()
 
-                if judgment["verdict"] == "accept":
-                    accepted_tasks.append({"task": task_obj, "result": result, "verify": verify_result})
-                    completed.add(task_obj["id"])
-                else:
-                    rejected_tasks.append({"task": task_obj, "judgment": judgment})
-                    failed.add(task_obj["id"])
-
-            # Check if any waiting tasks are now ready
-            newly_ready = []
-            still_waiting = []
-
-            for waiting_task in waiting:
-                deps = waiting_task.get("depends_on", [])
-                # Task is ready if all deps are completed (skip if any dep failed)
-                deps_failed = any(dep_id in failed for dep_id in deps)
-                deps_ready = all(dep_id in completed for dep_id in deps)
-
-                if deps_failed:
-                    # Dependency failed, skip this task
-                    print(f"  Skipping {waiting_task['id']} - dependency failed")
-                    rejected_tasks.append({
-                        "task": waiting_task,
-                        "judgment": {
-                            "verdict": "reject",
-                            "rationale": "Skipped due to failed dependency",
-                            "blocking_issues": ["Dependency task failed"]
-                        }
-                    })
-                    failed.add(waiting_task["id"])
-                elif deps_ready:
-                    newly_ready.append(waiting_task)
-                else:
-                    still_waiting.append(waiting_task)
+                if judgment["verdict"] != "accept":
+                    rejected_tasks.append({"task": task_obj, "judgment": judgment, "diff": diff})
+                    skip_dependents(task_obj["id"])
+                    continue
 
-            waiting = still_waiting
+                accepted_tasks.append({"task": task_obj, "result": result, "verify": verify_result, "diff": diff})
 
-            # Submit newly ready tasks
-            for task in newly_ready:
-                future = executor.submit(execute_task_with_stages, task, artifacts_dir, task_lock)
-                futures[future] = task
+                # Submit dependents whose last unfinished dependency this was
+                for dep_id in dependents[task_obj["id"]]:
+                    pending_count[dep_id] -= 1
+                    if pending_count[dep_id] == 0 and dep_id not in skipped:
+                        future = executor.submit(
+                            execute_task_with_stages, task_map[dep_id], artifacts_dir, task_lock, cwd
+                        )
+                        futures[future] = task_map[dep_id]
 
     return accepted_tasks, rejected_tasks
 
@@ -319,20 +496,30 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--dry-run", action="store_true", help="Run pipeline without creating PRs or issues (for testing)")
 
 
-def process_single_issue(repo: str, issue_number: int, dry_run: bool = False) -> dict:
+def process_single_issue(
+    repo: str,
+    issue_number: int,
+    dry_run: bool = False,
+    issue: dict | None = None,
+    cwd: str | None = None
+) -> dict:
     """
     Process a single issue through the spec2pr pipeline.
 
+    If issue is given (prefetched by process_batch), load_spec skips
+    its own GitHub fetch. If cwd is given, all repository work happens
+    in that working tree instead of the current directory.
+
     Returns:
         Dict with keys: issue, branch, pr_url, status (success/failure)
     """
     artifacts_dir = Path(f".spec2pr/artifacts/{issue_number}")
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(artifacts_dir)
 
     start_time_dt = datetime.now()
     start_time = start_time_dt.strftime("%Y-%m-%d %H:%M:%S")
-    print(f"Pipeline started at: {start_time}")
-    print(f"=== spec2pr: Processing {repo}#{issue_number} ===")
+    log(f"Pipeline started at: {start_time}")
+    log(f"=== spec2pr: Processing {repo}#{issue_number} ===")
 
     result = {
         "issue": issue_number,
@@ -343,65 +530,77 @@ def process_single_issue(repo: str, issue_number: int, dry_run: bool = False) ->
 
     try:
         # Stage 1: Load spec from GitHub issue
-        print("\n[1/7] Loading spec from issue...")
-        spec = load_spec(repo, issue_number)
+        log("\n[1/7] Loading spec from issue...")
+        spec = load_spec(repo, issue_number, issue)
         write_json(artifacts_dir / "spec.json", spec)
-        print(f"  Spec: {spec['title']}")
+        log(f"  Spec: {spec['title']}")
+
+        # Fetch origin/main in the background; publish waits on it before rebasing
+        main_fetch = None if dry_run else prefetch_main(cwd)
 
         # Stage 2: Plan tasks (Claude Code headless)
-        print("\n[2/7] Planning tasks...")
-        tasks = plan_tasks(spec)
+        log("\n[2/7] Planning tasks...")
+        tasks = plan_tasks(spec, cwd)
         write_json(artifacts_dir / "tasks.json", {"tasks": tasks})
-        print(f"  Planned {len(tasks)} task(s)")
+        log(f"  Planned {len(tasks)} task(s)")
+
+        # Create every task's artifact directory in one pass, up front
+        for task in tasks:
+            ensure_dir(artifacts_dir / task["id"])
 
         # Build dependency graph and get execution order
         try:
             ordered_tasks = build_dependency_graph(tasks)
-            print(f"  Tasks ordered by dependencies")
+            log(f"  Tasks ordered by dependencies")
         except ValueError as e:
-            print(f"Error in task dependencies: {e}", file=sys.stderr)
+            log(f"Error in task dependencies: {e}", file=sys.stderr)
             return result
 
         # Stage 3-6: Execute tasks in parallel (respecting dependencies)
-        print("\n[3-6/7] Executing tasks in parallel...")
-        accepted_tasks, rejected_tasks = execute_tasks_parallel(ordered_tasks, artifacts_dir)
+        log("\n[3-6/7] Executing tasks in parallel...")
+        accepted_tasks, rejected_tasks = execute_tasks_parallel(ordered_tasks, artifacts_dir, cwd=cwd)
+
+        # Stage 4: Review all executed tasks' changes in one reviewer call;
+        # skipped tasks and tasks without changes have nothing to review
+        reviewable = [item for item in accepted_tasks + rejected_tasks if item.get("diff")]
+        if reviewable:
+            log(f"\n[4/7] Reviewing code changes for {len(reviewable)} task(s)...")
+            review_tasks(reviewable, artifacts_dir, cwd)
 
         # Build executed_tasks summary
-        executed_tasks = []
-        for at in accepted_tasks:
-            executed_tasks.append({
-                "id": at["task"]["id"],
-                "title": at["task"]["title"],
-                "status": "accept"
-            })
-        for rt in rejected_tasks:
-            executed_tasks.append({
-                "id": rt["task"]["id"],
-                "title": rt["task"]["title"],
-                "status": "reject"
-            })
+        executed_tasks = [
+            {"id": item["task"]["id"], "title": item["task"]["title"], "status": status}
+            for items, status in ((accepted_tasks, "accept"), (rejected_tasks, "reject"))
+            for item in items
+        ]
 
         # Stage 7: Publish results
-        print("\n[7/7] Publishing results...")
+        log("\n[7/7] Publishing results...")
 
         if dry_run:
             if accepted_tasks:
-                print(f"  [DRY RUN] Would create PR with {len(accepted_tasks)} task(s)")
+                log(f"  [DRY RUN] Would create PR with {len(accepted_tasks)} task(s)")
             for rt in rejected_tasks:
-                print(f"  [DRY RUN] Would create issue for rejected task {rt['task']['id']}")
+                log(f"  [DRY RUN] Would create issue for rejected task {rt['task']['id']}")
         else:
-            # Create single PR for all accepted tasks
-            if accepted_tasks:
-                pr_url = publish_combined_pr(repo, spec, accepted_tasks, issue_number)
-                print(f"  Created PR: {pr_url}")
-                result["pr_url"] = pr_url
-            else:
-                print("  No tasks accepted - skipping PR creation")
+            # Issues for rejected tasks are independent API calls, so create
+            # them concurrently, overlapping with the PR's git work
+            with ThreadPoolExecutor(max_workers=PUBLISH_ISSUE_WORKERS) as executor:
+                issue_futures = [
+                    executor.submit(publish_issue, repo, rt["task"], rt["judgment"])
+                    for rt in rejected_tasks
+                ]
+
+                # Create single PR for all accepted tasks
+                if accepted_tasks:
+                    pr_url = publish_combined_pr(repo, spec, accepted_tasks, issue_number, cwd, main_fetch)
+                    log(f"  Created PR: {pr_url}")
+                    result["pr_url"] = pr_url
+                else:
+                    log("  No tasks accepted - skipping PR creation")
 
-            # Create issues for rejected tasks
-            for rt in rejected_tasks:
-                issue_url = publish_issue(repo, rt["task"], rt["judgment"])
-                print(f"  Created issue for {rt['task']['id']}: {issue_url}")
+                for rt, future in zip(rejected_tasks, issue_futures):
+                    log(f"  Created issue for {rt['task']['id']}: {future.result()}")
 
         # Generate and print summary
         end_time_dt = datetime.now()
@@ -427,27 +626,65 @@ def process_single_issue(repo: str, issue_number: int, dry_run: bool = False) ->
         summary_file = Path(f".spec2pr/artifacts/{issue_number}/summary.json")
         write_json(summary_file, summary)
 
-        # Print human-readable summary
-        print("\n=== Pipeline Summary ===")
-        print(f"Issue: {repo}#{issue_number}")
-        print(f"Start: {start_time}")
-        print(f"End: {end_time}")
-        print(f"Duration: {duration}s")
-        print(f"Status: {final_status}")
-        print(f"Tasks: {len(accepted_tasks)} accepted, {len(rejected_tasks)} rejected out of {len(executed_tasks)} executed")
-        print("=== spec2pr: Complete ===")
+        # Print human-readable summary as one write, so summaries of issues
+        # processed concurrently by process_batch stay contiguous
+        log("\n".join([
+            "\n=== Pipeline Summary ===",
+            f"Issue: {repo}#{issue_number}",
+            f"Start: {start_time}",
+            f"End: {end_time}",
+            f"Duration: {duration}s",
+            f"Status: {final_status}",
+            f"Tasks: {len(accepted_tasks)} accepted, {len(rejected_tasks)} rejected out of {len(executed_tasks)} executed",
+            "=== spec2pr: Complete ===",
+        ]))
 
         result["status"] = "success"
         return result
 
     except Exception as e:
-        print(f"Error processing issue {issue_number}: {e}", file=sys.stderr)
+        log(f"Error processing issue {issue_number}: {e}", file=sys.stderr)
         return result
 
 
+def _process_issue_in_worktree(
+    repo: str,
+    issue_number: int,
+    dry_run: bool,
+    issue: dict | None
+) -> dict:
+    """
+    Process an issue in its own git worktree so it can run alongside others.
+
+    Ignored files of the current tree (installed dependencies, build output)
+    are linked into the worktree, so verification sees the same environment.
+    """
+    worktree = WORKTREES_DIR / f"issue-{issue_number}"
+    remove_worktree(str(worktree))
+    try:
+        add_worktree(str(worktree))
+    except subprocess.CalledProcessError as e:
+        log(f"Error creating worktree for issue {issue_number}: {e.stderr}", file=sys.stderr)
+        return {
+            "issue": issue_number,
+            "branch": f"spec2pr/issue-{issue_number}",
+            "pr_url": None,
+            "status": "failure"
+        }
+    try:
+        link_ignored_paths(None, str(worktree))
+        return process_single_issue(repo, issue_number, dry_run, issue, str(worktree))
+    finally:
+        remove_worktree(str(worktree))
+
+
 def process_batch(repo: str, issue_numbers: list[int], dry_run: bool = False) -> list[dict]:
     """
-    Process multiple issues sequentially through the spec2pr pipeline.
+    Process multiple issues concurrently through the spec2pr pipeline.
+
+    A single issue runs directly in the current working tree. With more
+    than one issue, each gets its own git worktree under
+    .spec2pr/worktrees/ so branches and uncommitted changes never collide.
 
     Args:
         repo: Target repository (owner/repo)
@@ -455,15 +692,36 @@ def process_batch(repo: str, issue_numbers: list[int], dry_run: bool = False) ->
         dry_run: If True, don't create PRs or issues
 
     Returns:
-        List of result dicts, each with keys: issue, branch, pr_url, status
+        List of result dicts (in input order), each with keys: issue, branch, pr_url, status
     """
-    batch_results = []
+    issue_numbers = list(dict.fromkeys(issue_numbers))  # Drop duplicates, keep order
 
-    for issue_number in issue_numbers:
-        result = process_single_issue(repo, issue_number, dry_run)
-        batch_results.append(result)
+    # A single issue is fetched by load_spec through get_issue, whose ETag
+    # cache turns a rerun into a 304
+    if len(issue_numbers) == 1:
+        return [process_single_issue(repo, issue_numbers[0], dry_run)]
+
+    # Prefetch all issues in one GraphQL request; anything missing is
+    # fetched individually by load_spec
+    try:
+        issues = get_issues_batch(repo, issue_numbers)
+    except RuntimeError as e:
+        print(f"Warning: Batch issue fetch failed, fetching individually: {e}", file=sys.stderr)
+        issues = {}
+
+    results_by_issue = {}
+    max_workers = min(len(issue_numbers), os.cpu_count() or 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _process_issue_in_worktree, repo, n, dry_run, issues.get(n)
+            ): n
+            for n in issue_numbers
+        }
+        for future in as_completed(futures):
+            results_by_issue[futures[future]] = future.result()
 
-    return batch_results
+    return [results_by_issue[n] for n in issue_numbers]
 
 
 def main():
@@ -474,9 +732,10 @@ def main():
     # Handle --status flag
     if args.status:
         status, exit_code = check_status()
-        for component, result in status.items():
-            status_symbol = "✓" if result["ok"] else "✗"
-            print(f"{status_symbol} {component}: {result['message']}")
+        log("\n".join(
+            f"{'✓' if result['ok'] else '✗'} {component}: {result['message']}"
+            for component, result in status.items()
+        ))
         sys.exit(exit_code)
 
     # Determine repo from environment if not provided
@@ -0,0 +1,97 @@
+"""Result cache for planning, code review and verification, keyed by a hash of each stage's inputs.
+
+Disabled unless SPEC2PR_CACHE=1 is set in the environment.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from adapters.fs import write_atomic
+
+
+CACHE_DIR = Path(".spec2pr/cache")
+
+# Entries older than this are treated as misses and evicted
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Most entries kept per stage; the least recently written are evicted first
+CACHE_MAX_ENTRIES = 256
+
+
+def cache_enabled() -> bool:
+    """Check whether stage result caching is turned on."""
+    return os.environ.get("SPEC2PR_CACHE") == "1"
+
+
+def cache_key(*parts: Any) -> str:
+    """Fingerprint stage inputs with SHA-256 over their canonical JSON form."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def cache_get(stage: str, key: str) -> Any | None:
+    """
+    Look up a cached stage result.
+
+    Args:
+        stage: Stage name, used as the cache subdirectory
+        key: Input fingerprint from cache_key()
+
+    Returns:
+        The cached value, or None on a miss, an expired entry, or when caching is disabled
+    """
+    if not cache_enabled():
+        return None
+
+    path = CACHE_DIR / stage / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL_SECONDS:
+            path.unlink(missing_ok=True)
+            return None
+        return json.loads(path.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def cache_put(stage: str, key: str, value: Any) -> None:
+    """
+    Store a stage result, then evict expired and excess entries.
+
+    Args:
+        stage: Stage name, used as the cache subdirectory
+        key: Input fingerprint from cache_key()
+        value: JSON-serializable result to store
+    """
+    if not cache_enabled():
+        return
+
+    stage_dir = CACHE_DIR / stage
+    write_atomic(stage_dir / f"{key}.json", json.dumps(value).encode())
+
+    _evict(stage_dir)
+
+
+def _evict(stage_dir: Path) -> None:
+    """Drop expired entries and trim the directory to CACHE_MAX_ENTRIES by mtime."""
+    now = time.time()
+    entries = []
+    with os.scandir(stage_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime > CACHE_TTL_SECONDS:
+                Path(entry.path).unlink(missing_ok=True)
+            else:
+                entries.append((mtime, entry.path))
+
+    if len(entries) > CACHE_MAX_ENTRIES:
+        entries.sort()
+        for _, stale_path in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+            Path(stale_path).unlink(missing_ok=True)
@@ -0,0 +1,40 @@
+"""Headless Claude Code invocation shared by the LLM-backed stages."""
+
+import subprocess
+
+from stages.process import run_in_session
+
+
+def run_claude(args: list[str], prompt: str, timeout: float, cwd: str | None = None) -> subprocess.CompletedProcess:
+    """
+    Run a claude command with the prompt on stdin, killing it after timeout.
+
+    The timeout kills claude's whole process group, so shell commands a
+    worker started can't outlive it in a worktree that is about to be
+    removed. A timed-out run is reported like any other failed run - a non-zero
+    returncode with the reason in stderr - so callers' existing error
+    handling covers it.
+
+    Args:
+        args: Command line, starting with "claude"
+        prompt: Prompt to send on stdin
+        timeout: Seconds to wait before killing the process
+        cwd: Working directory for the process
+
+    Returns:
+        CompletedProcess with text stdout and stderr
+    """
+    try:
+        return run_in_session(
+            args,
+            input=prompt,
+            timeout=timeout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=cwd,
+        )
+    except subprocess.TimeoutExpired as e:
+        # Output captured before the kill is raw bytes, whatever text= says
+        stdout = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else e.stdout or ""
+        return subprocess.CompletedProcess(args, -9, stdout, f"timed out after {timeout}s")
@@ -1,21 +1,40 @@
 """Code review stage - uses Claude to review code changes against task spec."""
 
 import json
-import re
+import signal
 import subprocess
+import sys
+import threading
 from pathlib import Path
 
+from stages.cache import cache_get, cache_key, cache_put
+from stages.process import signal_group
+from stages.prompts import find_json, load_prompt, strip_fence
+
 
 REVIEWER_PROMPT = Path(__file__).parent.parent / "prompts" / "reviewer.md"
 
+# Kill the reviewer if it has not produced a result by then
+REVIEW_TIMEOUT_SECONDS = 600
+
+# Reviewer command line; the prompt is written to stdin
+REVIEWER_ARGS = [
+    "claude",
+    "--print",
+    "--dangerously-skip-permissions",
+    "--allowedTools", "Read",
+    "--output-format", "json",
+]
 
-def run_code_review(task: dict, diff: str) -> dict:
+
+def run_code_review(task: dict, diff: str, cwd: str | None = None) -> dict:
     """
     Use Claude to review code changes against task specification.
 
     Args:
         task: Task dict with id, title, goal, files_allowlist, non_goals
         diff: Git diff output as string
+        cwd: Working tree the reviewer reads files from (defaults to current dir)
 
     Returns:
         Review dict matching code_review.schema.json with structure:
@@ -29,21 +48,113 @@ def run_code_review(task: dict, diff: str) -> dict:
             }
         }
     """
-    # Read the reviewer prompt
-    prompt = REVIEWER_PROMPT.read_text()
+    full_prompt = _build_prompt(task, diff)
+
+    key = cache_key(full_prompt)
+    cached = cache_get("review", key)
+    if cached is not None:
+        return {
+            "task": task,
+            "diff": diff,
+            "feedback": cached,
+        }
+
+    # Run Claude Code headlessly
+    result = _run_reviewer(full_prompt, cwd)
+
+    if result.returncode != 0:
+        # Log full output for debugging
+        print(f"Reviewer Claude stderr: {result.stderr}", file=sys.stderr)
+        print(f"Reviewer Claude stdout: {result.stdout[:1000]}", file=sys.stderr)
+        # Default to requesting changes if reviewer fails
+        return {
+            "task": task,
+            "diff": diff,
+            "feedback": _failure_feedback(
+                f"Code review failed: {result.stderr[:200] or 'timeout/error'}",
+                "Code review process encountered an error",
+            ),
+        }
+
+    # Parse feedback from output
+    output = result.stdout.strip()
+    feedback = _parse_feedback(output)
+    if feedback is None:
+        # Default to requesting changes if we can't parse; not cached, so a
+        # rerun gets a fresh review
+        feedback = _failure_feedback("Failed to parse review feedback", "Unable to complete code review")
+    else:
+        cache_put("review", key, feedback)
 
-    # Build context for review
-    context = {
+    return {
         "task": task,
         "diff": diff,
+        "feedback": feedback,
     }
 
-    full_prompt = f"""{prompt}
+
+def run_code_review_batch(pairs: list[tuple[dict, str]], cwd: str | None = None) -> list[dict]:
+    """
+    Review several tasks' changes with a single reviewer call.
+
+    Cached reviews are reused; the rest are sent together in one prompt. A
+    batched response is cached under the batch prompt, never under a task's
+    own prompt, since it was produced from a different prompt. Any task
+    missing from the batched response (or all of them, if the response can't
+    be parsed) is reviewed on its own with run_code_review.
+
+    Args:
+        pairs: List of (task, diff) tuples
+        cwd: Working tree the reviewer reads files from (defaults to current dir)
+
+    Returns:
+        Review dicts in the same order as pairs, as returned by run_code_review
+    """
+    reviews: dict[str, dict] = {}
+    pending = []
+    for task, diff in pairs:
+        cached = cache_get("review", cache_key(_build_prompt(task, diff)))
+        if cached is not None:
+            reviews[task["id"]] = cached
+        else:
+            pending.append((task, diff))
+
+    if len(pending) > 1:
+        batch_prompt = _build_batch_prompt(pending)
+        batch_key = cache_key(batch_prompt)
+        batch_feedback = cache_get("review", batch_key)
+        if batch_feedback is None:
+            batch_feedback = {}
+            result = _run_reviewer(batch_prompt, cwd)
+            if result.returncode == 0:
+                batch_feedback = _parse_batch_feedback(result.stdout.strip())
+            # Only a response covering every task is cached, so a partial one
+            # is retried as a batch next time
+            if all(task["id"] in batch_feedback for task, _ in pending):
+                cache_put("review", batch_key, batch_feedback)
+        for task, _ in pending:
+            if task["id"] in batch_feedback:
+                reviews[task["id"]] = batch_feedback[task["id"]]
+
+    results = []
+    for task, diff in pairs:
+        if task["id"] in reviews:
+            results.append({"task": task, "diff": diff, "feedback": reviews[task["id"]]})
+        else:
+            results.append(run_code_review(task, diff, cwd))
+    return results
+
+
+def _build_prompt(task: dict, diff: str) -> str:
+    """Build the reviewer prompt for a single task."""
+    prompt = load_prompt(REVIEWER_PROMPT)
+
+    return f"""{prompt}
 
 ## Task Specification
 
 ```json
-{json.dumps(task, indent=2)}
+{json.dumps(task, separators=(",", ":"))}
 ```
 
 ## Git Diff
@@ -62,53 +173,148 @@ Review the changes and output only valid JSON matching this structure:
 ```
 """
 
-    # Run Claude Code headlessly
-    result = subprocess.run(
-        [
-            "claude",
-            "--print",
-            "--dangerously-skip-permissions",
-            "--allowedTools", "Read",
-            "--output-format", "json",
-            "-p", full_prompt,
-        ],
-        capture_output=True,
-        text=True,
+
+def _build_batch_prompt(pairs: list[tuple[dict, str]]) -> str:
+    """Build one reviewer prompt covering several tasks."""
+    prompt = load_prompt(REVIEWER_PROMPT)
+    changes = "\n\n".join(
+        f"""### Task {task['id']}
+
+```json
+{json.dumps(task, separators=(",", ":"))}
+```
+
+```
+{diff}
+```"""
+        for task, diff in pairs
     )
 
-    if result.returncode != 0:
-        # Log full output for debugging
-        import sys
-        print(f"Reviewer Claude stderr: {result.stderr}", file=sys.stderr)
-        print(f"Reviewer Claude stdout: {result.stdout[:1000]}", file=sys.stderr)
-        # Default to requesting changes if reviewer fails
-        feedback = {
-            "verdict": "request_changes",
-            "issues": [{
-                "severity": "blocking",
-                "category": "correctness",
-                "message": f"Code review failed: {result.stderr[:200] or 'timeout/error'}"
-            }],
-            "summary": "Code review process encountered an error",
-        }
-        return {
-            "task": task,
-            "diff": diff,
-            "feedback": feedback,
-        }
+    return f"""{prompt}
 
-    # Parse feedback from output
-    output = result.stdout.strip()
-    feedback = _parse_feedback(output)
+## Tasks and Git Diffs
+
+Review each task's diff independently, against that task's specification only.
+
+{changes}
 
+Output only valid JSON with one review per task, matching this structure:
+```json
+{{
+  "reviews": [
+    {{
+      "task_id": "task-id",
+      "verdict": "approve",
+      "issues": [],
+      "summary": "Brief assessment"
+    }}
+  ]
+}}
+```
+"""
+
+
+def _failure_feedback(message: str, summary: str) -> dict:
+    """Build request_changes feedback for a review that could not be completed."""
     return {
-        "task": task,
-        "diff": diff,
-        "feedback": feedback,
+        "verdict": "request_changes",
+        "issues": [{
+            "severity": "blocking",
+            "category": "correctness",
+            "message": message
+        }],
+        "summary": summary,
     }
 
 
-def _parse_feedback(output: str) -> dict:
+def _run_reviewer(full_prompt: str, cwd: str | None) -> subprocess.CompletedProcess:
+    """
+    Run the reviewer, returning as soon as it has printed a complete JSON object.
+
+    Stdout is read line by line instead of waiting for the process to exit;
+    once a top-level JSON object has been decoded the process is terminated.
+    The process is killed after REVIEW_TIMEOUT_SECONDS. The reviewer runs in
+    its own session, and both signals go to the whole process group: tools
+    it spawned would otherwise keep stdout open after it died.
+
+    Args:
+        full_prompt: Prompt to send on stdin
+        cwd: Working directory for the process
+
+    Returns:
+        CompletedProcess with the captured output; returncode is 0 if a JSON
+        object was received, even though the process was terminated early
+    """
+    proc = subprocess.Popen(
+        REVIEWER_ARGS,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd,
+        start_new_session=True,
+    )
+    timer = threading.Timer(REVIEW_TIMEOUT_SECONDS, signal_group, args=(proc, signal.SIGKILL))
+    timer.start()
+
+    # Drain stderr on the side so a chatty process can't block on a full pipe
+    stderr_chunks = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.extend(proc.stderr), daemon=True
+    )
+    stderr_reader.start()
+
+    # Feed the prompt from a thread too, so a large prompt can't deadlock
+    # against the reviewer filling its stdout pipe
+    stdin_writer = threading.Thread(target=_write_stdin, args=(proc, full_prompt), daemon=True)
+    stdin_writer.start()
+
+    decoder = json.JSONDecoder()
+    lines = []
+    complete = False
+    try:
+        for line in proc.stdout:
+            lines.append(line)
+            # A top-level object can only end on a line ending in "}"
+            if not line.rstrip().endswith("}"):
+                continue
+            try:
+                decoder.raw_decode("".join(lines).lstrip())
+            except json.JSONDecodeError:
+                continue
+            complete = True
+            break
+    finally:
+        timer.cancel()
+        # Stop the reviewer and anything it spawned, before reaping it so its
+        # pid (the group id) can't have been reused
+        signal_group(proc, signal.SIGTERM if complete else signal.SIGKILL)
+        proc.wait()
+        stderr_reader.join(timeout=5)
+        proc.stdout.close()
+        # A process that escaped the group could still hold stderr open;
+        # closing it under the blocked reader thread would hang, so leave it
+        if not stderr_reader.is_alive():
+            proc.stderr.close()
+
+    return subprocess.CompletedProcess(
+        REVIEWER_ARGS,
+        0 if complete else proc.returncode,
+        "".join(lines),
+        "".join(stderr_chunks),
+    )
+
+
+def _write_stdin(proc: subprocess.Popen, text: str) -> None:
+    """Write text to the process's stdin and close it, ignoring an early exit."""
+    try:
+        proc.stdin.write(text)
+        proc.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+
+def _parse_feedback(output: str) -> dict | None:
     """
     Parse feedback JSON from Claude output.
 
@@ -116,53 +322,74 @@ def _parse_feedback(output: str) -> dict:
         output: Claude stdout
 
     Returns:
-        Feedback dict with verdict, issues, summary
+        Feedback dict with verdict, issues, summary, or None if none could be parsed
+    """
+    feedback = _parse_response(output, "verdict")
+    if not feedback:
+        return None
+    return _normalize_feedback(feedback)
+
+
+def _parse_batch_feedback(output: str) -> dict[str, dict]:
+    """
+    Parse a batched review response from Claude output.
+
+    Args:
+        output: Claude stdout
+
+    Returns:
+        Feedback dicts keyed by task id; empty if the response can't be parsed
     """
-    feedback = None
+    response = _parse_response(output, "reviews")
+    if not isinstance(response, dict) or not isinstance(response.get("reviews"), list):
+        return {}
+
+    feedback_by_task = {}
+    for review in response["reviews"]:
+        if isinstance(review, dict) and "task_id" in review and "verdict" in review:
+            task_id = review.pop("task_id")
+            feedback_by_task[task_id] = _normalize_feedback(review)
+    return feedback_by_task
+
+
+def _parse_response(output: str, required_key: str) -> dict | None:
+    """
+    Extract the reviewer's JSON object from Claude output.
+
+    Args:
+        output: Claude stdout
+        required_key: Key a bare (unwrapped) response object must contain
+
+    Returns:
+        Parsed response object, or None if none could be found
+    """
+    response_obj = None
 
     try:
         response = json.loads(output)
         if isinstance(response, dict):
             # Handle wrapped response format
             if "result" in response:
-                result_text = response["result"]
-                # Strip markdown code block if present
-                if result_text.startswith("```"):
-                    result_text = re.sub(r'^```(?:json)?\n?', '', result_text)
-                    result_text = re.sub(r'\n?```$', '', result_text)
-                feedback = json.loads(result_text)
-            # Handle direct feedback format
-            elif "verdict" in response:
-                feedback = response
+                result_text = strip_fence(response["result"])
+                response_obj = json.loads(result_text)
+            # Handle direct response format
+            elif required_key in response:
+                response_obj = response
     except json.JSONDecodeError:
         pass
 
     # Try to find JSON object in output
-    if not feedback:
-        json_match = re.search(r'\{[\s\S]*\}', output)
-        if json_match:
-            try:
-                parsed = json.loads(json_match.group())
-                if "verdict" in parsed:
-                    feedback = parsed
-            except json.JSONDecodeError:
-                pass
+    if not response_obj:
+        response_obj = find_json(
+            output, "{", lambda value: isinstance(value, dict) and required_key in value
+        )
+
+    return response_obj or None
 
-    # Default to requesting changes if we can't parse
-    if not feedback:
-        return {
-            "verdict": "request_changes",
-            "issues": [{
-                "severity": "blocking",
-                "category": "correctness",
-                "message": "Failed to parse review feedback"
-            }],
-            "summary": "Unable to complete code review",
-        }
 
-    # Fix inconsistency: "request_changes" with no issues should be "approve"
+def _normalize_feedback(feedback: dict) -> dict:
+    """Fix inconsistency: "request_changes" with no issues should be "approve"."""
     if feedback.get("verdict") == "request_changes" and not feedback.get("issues"):
         feedback["verdict"] = "approve"
         feedback["summary"] = feedback.get("summary", "") + " (auto-approved: no issues specified)"
-
     return feedback
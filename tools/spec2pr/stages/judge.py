@@ -1,15 +1,20 @@
 """Judge stage - uses Claude Code to evaluate task completion."""
 
 import json
-import re
-import subprocess
+import sys
 from pathlib import Path
 
+from stages.claude import run_claude
+from stages.prompts import find_json, load_prompt, strip_fence
+
 
 JUDGE_PROMPT = Path(__file__).parent.parent / "prompts" / "judge.md"
 
+# Kill the judge if it has not produced a judgment by then
+JUDGE_TIMEOUT_SECONDS = 600
+
 
-def judge(task: dict, result: dict, verify_result: dict) -> dict:
+def judge(task: dict, result: dict, verify_result: dict, cwd: str | None = None) -> dict:
     """
     Use Claude Code to judge if a task was completed correctly.
 
@@ -17,6 +22,7 @@ def judge(task: dict, result: dict, verify_result: dict) -> dict:
         task: Original task dict
         result: Result from run_task
         verify_result: Result from verify
+        cwd: Working tree the judge inspects (defaults to current dir)
 
     Returns:
         Judgment dict matching judgment.schema.json
@@ -33,7 +39,7 @@ def judge(task: dict, result: dict, verify_result: dict) -> dict:
         }
 
     # Read the judge prompt
-    prompt = JUDGE_PROMPT.read_text()
+    prompt = load_prompt(JUDGE_PROMPT)
 
     # Build context for judgment
     context = {
@@ -47,29 +53,28 @@ def judge(task: dict, result: dict, verify_result: dict) -> dict:
 ## Context
 
 ```json
-{json.dumps(context, indent=2)}
+{json.dumps(context, separators=(",", ":"))}
 ```
 
 Output only valid JSON matching the judgment schema.
 """
 
     # Run Claude Code headlessly
-    result = subprocess.run(
+    result = run_claude(
         [
             "claude",
             "--print",
             "--dangerously-skip-permissions",
             "--allowedTools", "Read,Bash",
             "--output-format", "json",
-            "-p", full_prompt,
         ],
-        capture_output=True,
-        text=True,
+        full_prompt,
+        JUDGE_TIMEOUT_SECONDS,
+        cwd,
     )
 
     if result.returncode != 0:
         # Log full output for debugging
-        import sys
         print(f"Judge Claude stderr: {result.stderr}", file=sys.stderr)
         print(f"Judge Claude stdout: {result.stdout[:1000]}", file=sys.stderr)
         # If Claude fails but CI passed, default to accept
@@ -90,20 +95,16 @@ Output only valid JSON matching the judgment schema.
         response = json.loads(output)
         if isinstance(response, dict):
             if "result" in response:
-                result_text = response["result"]
-                # Strip markdown code block if present
-                if result_text.startswith("```"):
-                    result_text = re.sub(r'^```(?:json)?\n?', '', result_text)
-                    result_text = re.sub(r'\n?```$', '', result_text)
+                result_text = strip_fence(response["result"])
                 return json.loads(result_text)
             return response
     except json.JSONDecodeError:
         pass
 
     # Try to find JSON object in output
-    json_match = re.search(r'\{[\s\S]*\}', output)
-    if json_match:
-        return json.loads(json_match.group())
+    judgment = find_json(output, "{", lambda value: isinstance(value, dict))
+    if judgment is not None:
+        return judgment
 
     # Default to accept if CI passed and we can't parse judgment
     return {
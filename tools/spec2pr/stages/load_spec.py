@@ -1,8 +1,14 @@
 """Load spec stage - parses GitHub issue into structured spec."""
 
 import re
+from typing import Optional
+
 from adapters.github import get_issue
 
+# Markdown heading (levels 1-3) and list item (-, *, or numbered)
+_RE_HEADING = re.compile(r"^#{1,3}\s+(.+)$")
+_RE_LIST_ITEM = re.compile(r"^[\-\*]\s+(.+)$|^\d+\.\s+(.+)$")
+
 
 def parse_sections(body: str) -> dict[str, str]:
     """Parse markdown sections from issue body."""
@@ -10,9 +16,11 @@ def parse_sections(body: str) -> dict[str, str]:
     current_section = "overview"
     current_content = []
 
-    for line in body.split("\n"):
-        # Check for heading
-        heading_match = re.match(r"^#{1,3}\s+(.+)$", line)
+    match_heading = _RE_HEADING.match
+    for line in body.splitlines():
+        # Check for heading; most lines aren't, so skip the regex unless
+        # the line starts with "#"
+        heading_match = line.startswith("#") and match_heading(line)
         if heading_match:
             # Save previous section
             if current_content:
@@ -35,13 +43,13 @@ def parse_list(text: str) -> list[str]:
     items = []
     for line in text.split("\n"):
         # Match list items (-, *, or numbered)
-        match = re.match(r"^[\-\*]\s+(.+)$|^\d+\.\s+(.+)$", line.strip())
+        match = _RE_LIST_ITEM.match(line.strip())
         if match:
             items.append(match.group(1) or match.group(2))
     return items
 
 
-def load_spec(repo: str, issue_number: int) -> dict:
+def load_spec(repo: str, issue_number: int, issue: Optional[dict] = None) -> dict:
     """
     Load and parse a GitHub issue into a structured spec.
 
@@ -51,12 +59,32 @@ def load_spec(repo: str, issue_number: int) -> dict:
     Args:
         repo: Repository in owner/repo format
         issue_number: GitHub issue number
+        issue: Prefetched issue data (skips the GitHub round-trip if given)
 
     Returns:
         Spec dict - either structured or with raw_content for natural language
     """
-    issue = get_issue(repo, issue_number)
-    body = issue["body"] or ""
+    if issue is None:
+        issue = get_issue(repo, issue_number)
+    return _parse_spec(repo, issue_number, issue["title"], issue["body"] or "")
+
+
+def _parse_spec(repo: str, issue_number: int, title: str, body: str) -> dict:
+    """Parse an issue's title and body into a spec dict."""
+    # Without a "#" there can be no headings, hence no structured sections:
+    # skip the section split and list parsing for plain-text specs
+    if "#" not in body:
+        return {
+            "id": f"{repo}#{issue_number}",
+            "title": title,
+            "overview": "\n".join(body.splitlines()).strip() or body,
+            "acceptance": [],
+            "constraints": [],
+            "interfaces": [],
+            "raw_content": f"# {title}\n\n{body}",
+            "format": "natural_language",
+        }
+
     sections = parse_sections(body)
 
     # Extract acceptance criteria
@@ -90,7 +118,7 @@ def load_spec(repo: str, issue_number: int) -> dict:
 
     spec = {
         "id": f"{repo}#{issue_number}",
-        "title": issue["title"],
+        "title": title,
         "overview": overview,
         "acceptance": acceptance,
         "constraints": constraints,
@@ -99,7 +127,7 @@ def load_spec(repo: str, issue_number: int) -> dict:
 
     # For natural language specs, include raw content so planner can interpret it
     if is_natural_language:
-        spec["raw_content"] = f"# {issue['title']}\n\n{body}"
+        spec["raw_content"] = f"# {title}\n\n{body}"
         spec["format"] = "natural_language"
     else:
         spec["format"] = "structured"
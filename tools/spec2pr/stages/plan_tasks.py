@@ -1,12 +1,23 @@
 """Plan tasks stage - uses Claude Code to break spec into tasks."""
 
+from collections import defaultdict
+import heapq
 import json
-import subprocess
+import os
+import re
+import sys
 from pathlib import Path
 
+from stages.cache import cache_get, cache_key, cache_put
+from stages.claude import run_claude
+from stages.prompts import find_json, load_prompt
+
 
 PLANNER_PROMPT = Path(__file__).parent.parent / "prompts" / "planner.md"
 
+# Kill the planner if it has not produced a plan by then
+PLAN_TIMEOUT_SECONDS = 600
+
 # Directories to exclude from file tree
 EXCLUDED_DIRS = {
     ".git", ".spec2pr", "__pycache__", "node_modules", ".pytest_cache",
@@ -20,6 +31,15 @@ INCLUDED_EXTENSIONS = {
     ".swift", ".css", ".scss", ".html", ".sql", ".toml", ".cfg", ".ini"
 }
 
+# Extension-less file names to include
+INCLUDED_NAMES = frozenset({"Makefile", "Dockerfile", "Gemfile", "Rakefile", "LICENSE", "README"})
+
+# Makefile targets that mean `make test` is worth offering
+MAKE_TEST_TARGETS = frozenset({"test", "check"})
+
+# Makefile rule line, capturing its target list (a ":=" assignment is not a rule)
+_RE_MAKE_RULE = re.compile(r'^([^\s#:=][^#:=]*):(?!=)')
+
 
 def build_dependency_graph(tasks: list[dict]) -> list[dict]:
     """
@@ -54,107 +74,141 @@ def build_dependency_graph(tasks: list[dict]) -> list[dict]:
                 )
 
     # Topological sort using Kahn's algorithm
-    # Calculate in-degree for each task
+    # Calculate in-degree for each task, and index which tasks depend on which
     in_degree = {task_id: 0 for task_id in task_map}
+    dependents = defaultdict(list)
     for task in tasks:
         for dep_id in task.get("depends_on", []):
             in_degree[task["id"]] += 1
+            dependents[dep_id].append(task["id"])
 
-    # Queue of tasks with no dependencies
-    queue = [task_id for task_id, degree in in_degree.items() if degree == 0]
+    # Min-heap of tasks with no dependencies, for deterministic ordering
+    heap = [task_id for task_id, degree in in_degree.items() if degree == 0]
+    heapq.heapify(heap)
     result = []
 
-    while queue:
-        # Sort queue for deterministic ordering
-        queue.sort()
-        task_id = queue.pop(0)
+    while heap:
+        task_id = heapq.heappop(heap)
         result.append(task_map[task_id])
 
         # Reduce in-degree for tasks that depend on this one
-        for other_task in tasks:
-            if task_id in other_task.get("depends_on", []):
-                in_degree[other_task["id"]] -= 1
-                if in_degree[other_task["id"]] == 0:
-                    queue.append(other_task["id"])
+        for dependent_id in dependents[task_id]:
+            in_degree[dependent_id] -= 1
+            if in_degree[dependent_id] == 0:
+                heapq.heappush(heap, dependent_id)
 
     return result
 
 
-def discover_verification_options() -> list[str]:
+def discover_verification_options(cwd: str | None = None) -> list[str]:
     """
     Discover what verification/CI options are available in the repo.
 
+    Args:
+        cwd: Repository root (defaults to current dir)
+
     Returns:
         List of available verification commands.
     """
+    root = Path(cwd or ".")
     options = []
 
+    # One directory listing answers every marker-file check below, instead
+    # of a stat per candidate
+    with os.scandir(root) as it:
+        names = {entry.name for entry in it}
+
     # Check for ci.sh
-    if Path("ci.sh").exists():
+    if "ci.sh" in names:
         options.append("./ci.sh")
 
     # Check for Makefile with test target
-    if Path("Makefile").exists():
-        content = Path("Makefile").read_text()
-        if "test:" in content or "check:" in content:
-            options.append("make test")
+    if "Makefile" in names:
+        # Stream the file and stop at the first matching target definition
+        with open(root / "Makefile", errors="replace") as makefile:
+            if any(
+                not MAKE_TEST_TARGETS.isdisjoint(match.group(1).split())
+                for match in map(_RE_MAKE_RULE.match, makefile)
+                if match
+            ):
+                options.append("make test")
 
     # Check for package.json with test script
-    if Path("package.json").exists():
-        import json
+    if "package.json" in names:
         try:
-            pkg = json.loads(Path("package.json").read_text())
+            pkg = json.loads((root / "package.json").read_bytes())
             if "scripts" in pkg and "test" in pkg["scripts"]:
                 options.append("npm test")
         except (json.JSONDecodeError, KeyError):
             pass
 
     # Check for Python test frameworks
-    if Path("pytest.ini").exists() or Path("pyproject.toml").exists() or Path("setup.py").exists():
+    if not names.isdisjoint({"pytest.ini", "pyproject.toml", "setup.py"}):
         options.append("pytest")
 
     # Check for go.mod
-    if Path("go.mod").exists():
+    if "go.mod" in names:
         options.append("go test ./...")
 
     # Check for Cargo.toml
-    if Path("Cargo.toml").exists():
+    if "Cargo.toml" in names:
         options.append("cargo test")
 
     return options
 
 
-def discover_file_tree(max_files: int = 200) -> str:
+def _walk_files(path: str, prefix: str, max_files: int, files: list[str], dirs: set[str]) -> bool:
     """
-    Discover the file tree of the current repository.
+    Collect included files under path, never descending into excluded directories.
+
+    Args:
+        path: Directory to scan
+        prefix: Path of this directory relative to the repository root, with trailing "/"
+        max_files: Stop once this many files have been collected
+        files: Relative file paths, appended to in place
+        dirs: Relative parent directories of collected files, added to in place
 
     Returns:
-        A string representation of the file tree for inclusion in prompts.
+        True once max_files has been reached
     """
-    files = []
-    dirs = set()
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
 
-    for path in Path(".").rglob("*"):
-        # Skip excluded directories
-        if any(excluded in path.parts for excluded in EXCLUDED_DIRS):
+    for entry in entries:
+        if entry.name in EXCLUDED_DIRS:
             continue
-
-        if path.is_file():
+        if entry.is_dir(follow_symlinks=False):
+            if _walk_files(entry.path, f"{prefix}{entry.name}/", max_files, files, dirs):
+                return True
+        elif entry.is_file():
             # Include files with known extensions or known names
-            if path.suffix in INCLUDED_EXTENSIONS or path.name in {
-                "Makefile", "Dockerfile", "Gemfile", "Rakefile", "LICENSE", "README"
-            }:
-                files.append(str(path))
+            if os.path.splitext(entry.name)[1] in INCLUDED_EXTENSIONS or entry.name in INCLUDED_NAMES:
+                files.append(prefix + entry.name)
                 # Track parent directories
-                dirs.add(str(path.parent))
+                dirs.add(prefix.rstrip("/") or ".")
+                if len(files) >= max_files:
+                    return True
+    return False
+
+
+def discover_file_tree(max_files: int = 200, cwd: str | None = None) -> str:
+    """
+    Discover the file tree of the current repository.
 
-        if len(files) >= max_files:
-            break
+    Args:
+        max_files: Maximum number of files to collect
+        cwd: Repository root (defaults to current dir)
 
+    Returns:
+        A string representation of the file tree for inclusion in prompts.
+    """
+    files = []
+    dirs = set()
+    _walk_files(cwd or ".", "", max_files, files, dirs)
     files.sort()
 
     # Discover verification options
-    verification_options = discover_verification_options()
+    verification_options = discover_verification_options(cwd)
 
     # Build tree representation
     tree_lines = ["## Repository File Tree", ""]
@@ -184,21 +238,22 @@ def discover_file_tree(max_files: int = 200) -> str:
     return "\n".join(tree_lines)
 
 
-def plan_tasks(spec: dict) -> list[dict]:
+def plan_tasks(spec: dict, cwd: str | None = None) -> list[dict]:
     """
     Use Claude Code to plan tasks from a spec.
 
     Args:
         spec: Parsed spec dict
+        cwd: Repository root to plan against (defaults to current dir)
 
     Returns:
         List of task dicts matching task.schema.json
     """
     # Read the planner prompt
-    prompt = PLANNER_PROMPT.read_text()
+    prompt = load_prompt(PLANNER_PROMPT)
 
     # Discover file tree for context
-    file_tree = discover_file_tree()
+    file_tree = discover_file_tree(cwd=cwd)
 
     # Build the full prompt with spec context
     full_prompt = f"""{prompt}
@@ -208,7 +263,7 @@ def plan_tasks(spec: dict) -> list[dict]:
 ## Spec to plan
 
 ```json
-{json.dumps(spec, indent=2)}
+{json.dumps(spec, separators=(",", ":"))}
 ```
 
 **IMPORTANT**: Use ONLY paths from the Repository File Tree above in `files_allowlist`. Do not guess or invent paths.
@@ -216,31 +271,50 @@ def plan_tasks(spec: dict) -> list[dict]:
 Output only valid JSON - an array of task objects.
 """
 
+    key = cache_key(full_prompt)
+    cached = cache_get("plan", key)
+    if cached is not None:
+        return cached
+
     # Run Claude Code headlessly
-    result = subprocess.run(
+    result = run_claude(
         [
             "claude",
             "--print",
             "--dangerously-skip-permissions",
             "--allowedTools", "Read,Bash",
             "--output-format", "json",
-            "-p", full_prompt,
         ],
-        capture_output=True,
-        text=True,
+        full_prompt,
+        PLAN_TIMEOUT_SECONDS,
+        cwd,
     )
 
     if result.returncode != 0:
         # Log full output for debugging
-        import sys
         print(f"Claude Code stderr: {result.stderr}", file=sys.stderr)
         print(f"Claude Code stdout: {result.stdout[:1000]}", file=sys.stderr)
         error_info = result.stderr or result.stdout[:500] or "unknown error (check logs)"
         raise RuntimeError(f"Claude Code failed: {error_info}")
 
-    # Parse the response - extract JSON from output
-    output = result.stdout.strip()
+    tasks = _parse_tasks(result.stdout.strip())
+    cache_put("plan", key, tasks)
+    return tasks
+
 
+def _parse_tasks(output: str) -> list[dict]:
+    """
+    Parse the task list from Claude output.
+
+    Args:
+        output: Claude stdout
+
+    Returns:
+        List of task dicts
+
+    Raises:
+        RuntimeError: If no task array can be found in the output
+    """
     # Handle JSON output format
     try:
         response = json.loads(output)
@@ -252,10 +326,11 @@ Output only valid JSON - an array of task objects.
     except json.JSONDecodeError:
         pass
 
-    # Try to find JSON array in output
-    import re
-    json_match = re.search(r'\[[\s\S]*\]', output)
-    if json_match:
-        return json.loads(json_match.group())
+    # Try to find JSON array of tasks in output
+    tasks = find_json(
+        output, "[", lambda value: isinstance(value, list) and all(isinstance(t, dict) for t in value)
+    )
+    if tasks is not None:
+        return tasks
 
     raise RuntimeError(f"Could not parse tasks from Claude output: {output[:500]}")
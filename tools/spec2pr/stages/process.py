@@ -0,0 +1,57 @@
+"""Subprocess helpers: run commands in their own session so a timeout kills everything they started."""
+
+import os
+import signal
+import subprocess
+from typing import Any
+
+
+def signal_group(proc: subprocess.Popen, sig: int) -> None:
+    """Send sig to proc's process group, ignoring a group that is already gone."""
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def run_in_session(
+    args: str | list[str],
+    input: str | bytes | None = None,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """
+    Like subprocess.run, but the process gets its own session and a timeout
+    kills its whole process group.
+
+    subprocess.run only kills the direct child, so anything it started (a
+    worker's shell commands, the test runner behind ./ci.sh) keeps running
+    and can hold the output pipes open.
+
+    Args:
+        args: Command to run, as for subprocess.Popen
+        input: Data to send on stdin
+        timeout: Seconds to wait before killing the process group
+        **kwargs: Passed on to subprocess.Popen
+
+    Returns:
+        CompletedProcess with whatever output was captured
+
+    Raises:
+        subprocess.TimeoutExpired: After the process group has been killed,
+            carrying the output captured so far
+    """
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+
+    with subprocess.Popen(args, start_new_session=True, **kwargs) as proc:
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            signal_group(proc, signal.SIGKILL)
+            stdout, stderr = proc.communicate()
+            raise subprocess.TimeoutExpired(args, timeout, output=stdout, stderr=stderr)
+        except BaseException:
+            signal_group(proc, signal.SIGKILL)
+            raise
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
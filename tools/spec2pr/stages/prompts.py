@@ -0,0 +1,60 @@
+"""Prompt loading and response parsing shared by the Claude-backed stages."""
+
+import functools
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable
+
+
+# Markdown code fence wrapped around a JSON result
+_RE_FENCE_OPEN = re.compile(r'^```(?:json)?\n?')
+_RE_FENCE_CLOSE = re.compile(r'\n?```$')
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(path: Path) -> str:
+    """Read a prompt template, once per process."""
+    return path.read_text()
+
+
+def reload_prompts() -> None:
+    """Drop cached prompt text so edited templates are re-read on next use."""
+    load_prompt.cache_clear()
+
+
+def strip_fence(text: str) -> str:
+    """Remove a markdown code fence wrapped around text, if there is one."""
+    if not text.startswith("```"):
+        return text
+    return _RE_FENCE_CLOSE.sub('', _RE_FENCE_OPEN.sub('', text))
+
+
+def find_json(text: str, opener: str, accept: Callable[[Any], bool]) -> Any | None:
+    """
+    Find the first JSON value embedded in free-form text.
+
+    Decodes forward from each occurrence of opener ("{" or "[") with
+    raw_decode, rather than matching a greedy regex across the whole text
+    and re-parsing the match.
+
+    Args:
+        text: Text that may contain JSON among prose
+        opener: Character the wanted value starts with
+        accept: Predicate the decoded value must satisfy
+
+    Returns:
+        The first accepted value, or None if there is none
+    """
+    decoder = json.JSONDecoder()
+    start = text.find(opener)
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if accept(value):
+                return value
+        start = text.find(opener, start + 1)
+    return None
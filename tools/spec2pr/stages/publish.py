@@ -1,17 +1,21 @@
 """Publish stage - creates PRs or issues based on judgment."""
 
 import re
-import subprocess
+import sys
+
+
+# "[spec2pr] Failed: " prefix that publish_issue puts on issue titles
+_RE_FAILED_PREFIX = re.compile(r'^\[spec2pr\]\s*Failed:\s*')
 
 
 def clean_title(title: str) -> str:
     """Remove spec2pr failure prefixes from issue titles for cleaner PR titles."""
-    # Strip "[spec2pr] Failed: " prefix if present
-    cleaned = re.sub(r'^\[spec2pr\]\s*Failed:\s*', '', title)
-    return cleaned
+    return _RE_FAILED_PREFIX.sub('', title)
 
 from adapters.github import (
+    MainFetch,
     delete_branch_if_exists,
+    delete_remote_branch,
     create_branch,
     commit_changes,
     rebase_on_main,
@@ -61,7 +65,14 @@ def _build_review_section(accepted_tasks: list) -> str:
     return "## Code Review Summary\n" + "\n".join(review_items) + "\n"
 
 
-def publish_combined_pr(repo: str, spec: dict, accepted_tasks: list, issue_number: int) -> str:
+def publish_combined_pr(
+    repo: str,
+    spec: dict,
+    accepted_tasks: list,
+    issue_number: int,
+    cwd: str | None = None,
+    prefetch: MainFetch | None = None
+) -> str:
     """
     Create a single PR for all accepted tasks.
 
@@ -70,33 +81,27 @@ def publish_combined_pr(repo: str, spec: dict, accepted_tasks: list, issue_numbe
         spec: Original spec dict
         accepted_tasks: List of {"task": task, "result": result, "verify": verify_result}
         issue_number: Original spec issue number to close
+        cwd: Working tree holding the task changes (defaults to current dir)
+        prefetch: Background fetch of origin/main started by prefetch_main()
 
     Returns:
         PR URL
     """
     branch_name = f"spec2pr/issue-{issue_number}"
 
-    # Clean up any existing remote branch from previous runs (keep local changes!)
-    subprocess.run(
-        ["git", "push", "origin", "--delete", branch_name],
-        capture_output=True,  # Don't fail if branch doesn't exist
-    )
-
-    # Create branch from current state (preserving task changes in working dir)
-    # First delete local branch if exists
-    subprocess.run(["git", "branch", "-D", branch_name], capture_output=True)
-    create_branch(branch_name)
+    # Create branch from current state (preserving task changes in working dir),
+    # replacing any local branch left over from a previous run
+    create_branch(branch_name, cwd=cwd, reset=True)
 
     # Commit all current changes (from all tasks)
-    all_files = []
+    all_files = set()
     task_summaries = []
     for item in accepted_tasks:
         task = item["task"]
         result = item["result"]
         verify = item["verify"]
 
-        files = result.get("files_modified", [])
-        all_files.extend(files)
+        all_files.update(result.get("files_modified", ()))
 
         status = "✅" if verify.get("passed", False) else "⚠️"
         task_summaries.append(f"- [{status}] **{task['id']}**: {task['title']}")
@@ -105,48 +110,58 @@ def publish_combined_pr(repo: str, spec: dict, accepted_tasks: list, issue_numbe
     commit_msg = f"spec2pr: {spec['title']}\n\nTasks completed:\n" + "\n".join(
         f"- {item['task']['id']}: {item['task']['title']}" for item in accepted_tasks
     )
-    has_changes = commit_changes(commit_msg)
+    committed_files = commit_changes(commit_msg, cwd=cwd)
 
-    if not has_changes:
-        import sys
+    if not committed_files:
+        delete_remote_branch(branch_name, cwd=cwd)
         print("Warning: No changes to commit. Worker may not have made modifications.", file=sys.stderr)
         # Return early - can't create PR without changes
         return "(no changes to commit)"
 
     # Rebase on latest main
-    if not rebase_on_main():
-        import sys
+    if not rebase_on_main(cwd=cwd, prefetch=prefetch):
         print("Warning: Rebase on main failed (conflicts). PR may have merge conflicts.", file=sys.stderr)
 
-    push_branch(branch_name, force=True)
+    # Clean up any existing remote branch from previous runs (keep local
+    # changes!). Done only now, so it never races the local ref updates above
+    delete_remote_branch(branch_name, cwd=cwd)
+    push_branch(branch_name, force=True, cwd=cwd)
 
     # Build review section
     review_section = _build_review_section(accepted_tasks)
 
     # Build PR body
+    title = clean_title(spec["title"])
+    tasks_completed = "\n".join(task_summaries)
     body = f"""## Summary
 
-{clean_title(spec['title'])}
+{title}
 
 Closes #{issue_number}
 
 ## Tasks Completed
 
-{chr(10).join(task_summaries)}
+{tasks_completed}
 
 ## Files Modified
 
-{', '.join(sorted(set(all_files))) if all_files else 'None'}
+{', '.join(sorted(all_files)) if all_files else 'None'}
 
 {review_section}
 ---
 *This PR was created automatically by [spec2pr](https://github.com/andreikorchagin/spec2pr). Please review carefully before merging.*
 """
 
-    return create_pr(repo, branch_name, f"spec2pr: {clean_title(spec['title'])}", body)
+    return create_pr(repo, branch_name, f"spec2pr: {title}", body)
 
 
-def publish_pr(repo: str, task: dict, result: dict, issue_number: int) -> str:
+def publish_pr(
+    repo: str,
+    task: dict,
+    result: dict,
+    issue_number: int,
+    cwd: str | None = None
+) -> str:
     """
     Create a PR for a successfully completed task.
 
@@ -155,6 +170,7 @@ def publish_pr(repo: str, task: dict, result: dict, issue_number: int) -> str:
         task: Task dict
         result: Result from run_task
         issue_number: Original spec issue number to close
+        cwd: Working tree holding the task changes (defaults to current dir)
 
     Returns:
         PR URL
@@ -162,20 +178,19 @@ def publish_pr(repo: str, task: dict, result: dict, issue_number: int) -> str:
     branch_name = f"spec2pr/issue-{issue_number}/{task['id']}"
 
     # Clean up any existing branch from previous runs
-    delete_branch_if_exists(branch_name)
+    delete_branch_if_exists(branch_name, cwd=cwd)
 
     # Create branch, commit, rebase on latest main, and push
-    create_branch(branch_name)
-    commit_changes(f"spec2pr: {task['title']}\n\nTask: {task['id']}\nGoal: {task['goal']}")
+    create_branch(branch_name, cwd=cwd)
+    commit_changes(f"spec2pr: {task['title']}\n\nTask: {task['id']}\nGoal: {task['goal']}", cwd=cwd)
 
     # Rebase on latest main to avoid conflicts with concurrent PRs
-    if not rebase_on_main():
+    if not rebase_on_main(cwd=cwd):
         # If rebase fails, push anyway - PR will show conflicts
         # but at least the work is preserved
-        import sys
         print("Warning: Rebase on main failed (conflicts). PR may have merge conflicts.", file=sys.stderr)
 
-    push_branch(branch_name, force=True)  # Force push after rebase
+    push_branch(branch_name, force=True, cwd=cwd)  # Force push after rebase
 
     # Create PR
     body = f"""## Summary
@@ -211,6 +226,7 @@ def publish_issue(repo: str, task: dict, judgment: dict) -> str:
     Returns:
         Issue URL
     """
+    blocking_issues = "\n".join(f"- {issue}" for issue in judgment.get("blocking_issues", ["Unknown"]))
     body = f"""## Task Failed
 
 **Task ID**: {task['id']}
@@ -219,7 +235,7 @@ def publish_issue(repo: str, task: dict, judgment: dict) -> str:
 
 ## Blocking Issues
 
-{chr(10).join(f'- {issue}' for issue in judgment.get('blocking_issues', ['Unknown']))}
+{blocking_issues}
 
 ## Judgment Details
 
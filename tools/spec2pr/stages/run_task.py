@@ -7,7 +7,10 @@ import subprocess
 import sys
 from pathlib import Path
 
+from adapters.github import KNOWN_TEXT_FILES
+from stages.claude import run_claude
 from stages.code_review import run_code_review as code_review
+from stages.prompts import load_prompt
 from stages.verify import verify
 
 
@@ -20,8 +23,14 @@ MODEL_ESCALATION = ["sonnet"]
 # Max iterations of verify+code-review loop
 MAX_ITERATIONS = 3
 
+# Kill a worker claude call that has not finished by then
+WORKER_TIMEOUT_SECONDS = 1800
 
-def run_task(task: dict) -> dict:
+# Most paths passed to a single `git checkout --`, to stay well under ARG_MAX
+REVERT_BATCH_SIZE = 500
+
+
+def run_task(task: dict, cwd: str | None = None, artifacts_dir: Path | None = None) -> dict:
     """
     Use Claude Code to implement a task with retry and iteration logic.
 
@@ -30,12 +39,17 @@ def run_task(task: dict) -> dict:
 
     Args:
         task: Task dict matching task.schema.json
+        cwd: Working tree to run the task in (defaults to current dir)
+        artifacts_dir: Directory for this task's verification log
 
     Returns:
         Result dict with success status, files_modified, summary, attempts
     """
     attempts = []
 
+    # Serialize the task once; every attempt and feedback iteration embeds it
+    task_json = json.dumps(task, separators=(",", ":"))
+
     for attempt_num, model in enumerate(MODEL_ESCALATION):
         print(f"  Attempt {attempt_num + 1}/{len(MODEL_ESCALATION)} with model: {model}", file=sys.stderr)
 
@@ -47,7 +61,7 @@ def run_task(task: dict) -> dict:
                 for i, a in enumerate(attempts)
             ])
 
-        result = _execute_task(task, model, previous_failures)
+        result = _execute_task(task, task_json, model, previous_failures, cwd)
         result["model"] = model
         result["attempt"] = attempt_num + 1
         # Store a copy in attempts to avoid circular reference when we add attempts to result
@@ -55,7 +69,7 @@ def run_task(task: dict) -> dict:
 
         if result.get("success", False):
             # Run verification and code-review iteration loop
-            result = _iterate_with_feedback(task, result, attempts)
+            result = _iterate_with_feedback(task, task_json, result, attempts, cwd, artifacts_dir)
             result["attempts"] = attempts
             return result
 
@@ -67,7 +81,14 @@ def run_task(task: dict) -> dict:
     return final_result
 
 
-def _iterate_with_feedback(task: dict, result: dict, attempts: list) -> dict:
+def _iterate_with_feedback(
+    task: dict,
+    task_json: str,
+    result: dict,
+    attempts: list,
+    cwd: str | None = None,
+    artifacts_dir: Path | None = None
+) -> dict:
     """
     Run verify and code-review loop with up to MAX_ITERATIONS iterations.
 
@@ -75,33 +96,44 @@ def _iterate_with_feedback(task: dict, result: dict, attempts: list) -> dict:
 
     Args:
         task: Task dict
+        task_json: Task serialized for the worker prompt
         result: Initial execution result
         attempts: List of previous attempts for context
+        cwd: Working tree to run in
+        artifacts_dir: Directory for this task's verification log
 
     Returns:
         Result dict after iteration (success or failure after max iterations)
     """
     review_history = []
+    # Reviews by diff: a fix attempt that leaves the diff unchanged gets the
+    # same review again without another reviewer call
+    reviews_by_diff: dict[str, dict] = {}
 
     for iteration in range(1, MAX_ITERATIONS + 1):
         print(f"  Iteration {iteration}/{MAX_ITERATIONS}: Running verify + code-review...", file=sys.stderr)
 
         # Run verification
-        verify_result = verify(task)
+        verify_result = verify(task, cwd, artifacts_dir)
         if not verify_result.get("passed", False):
             print(f"    Verify failed, skipping code-review this iteration", file=sys.stderr)
             continue
 
-        # Get git diff for code-review
-        diff_result = subprocess.run(
+        # Take the diff only after verify, since done_when commands (formatters,
+        # codegen) may rewrite tracked files and the review must see the result
+        diff = subprocess.run(
             ["git", "diff", "HEAD"],
             capture_output=True,
             text=True,
-        )
-        diff = diff_result.stdout
+            cwd=cwd,
+        ).stdout
 
         # Run code-review
-        review = code_review(task, diff)
+        if diff in reviews_by_diff:
+            review = {**reviews_by_diff[diff]}
+        else:
+            review = code_review(task, diff, cwd)
+            reviews_by_diff[diff] = review
         feedback = review.get("feedback", {})
         review["iteration"] = iteration
 
@@ -121,7 +153,7 @@ def _iterate_with_feedback(task: dict, result: dict, attempts: list) -> dict:
             feedback = _format_code_review_feedback(review)
             print(f"    Attempting fixes based on feedback...", file=sys.stderr)
 
-            fix_result = _execute_task_with_feedback(task, result["model"], feedback)
+            fix_result = _execute_task_with_feedback(task, task_json, result["model"], feedback, cwd)
             if not fix_result.get("success", False):
                 print(f"    Failed to apply fixes, giving up", file=sys.stderr)
                 result["review_history"] = review_history
@@ -151,19 +183,27 @@ def _format_code_review_feedback(review: dict) -> str:
     return "\n".join(feedback_lines)
 
 
-def _execute_task_with_feedback(task: dict, model: str, feedback: str) -> dict:
+def _execute_task_with_feedback(
+    task: dict,
+    task_json: str,
+    model: str,
+    feedback: str,
+    cwd: str | None = None
+) -> dict:
     """
     Execute a task with code-review feedback context.
 
     Args:
         task: Task dict
+        task_json: Task serialized for the prompt
         model: Model to use
         feedback: Formatted code-review feedback
+        cwd: Working tree to run in
 
     Returns:
         Result dict
     """
-    prompt = WORKER_PROMPT.read_text()
+    prompt = load_prompt(WORKER_PROMPT)
 
     feedback_context = ""
     if feedback:
@@ -183,23 +223,23 @@ Please address these issues in your next attempt.
 ## Task to implement
 
 ```json
-{json.dumps(task, indent=2)}
+{task_json}
 ```
 
 Implement this task now. Only modify files in the allowlist.
 """
 
-    result = subprocess.run(
+    result = run_claude(
         [
             "claude",
             "--print",
             "--dangerously-skip-permissions",
             "--allowedTools", "Read,Edit,Bash",
             "--model", model,
-            "-p", full_prompt,
         ],
-        capture_output=True,
-        text=True,
+        full_prompt,
+        WORKER_TIMEOUT_SECONDS,
+        cwd,
     )
 
     if result.returncode != 0:
@@ -213,48 +253,29 @@ Implement this task now. Only modify files in the allowlist.
             "model": model,
         }
 
-    # Get list of modified files
-    git_result = subprocess.run(
-        ["git", "diff", "--name-only"],
-        capture_output=True,
-        text=True,
-    )
-
-    KNOWN_TEXT_FILES = {
-        "Makefile", "Dockerfile", "Vagrantfile", "Gemfile", "Rakefile",
-        "LICENSE", "README", "CHANGELOG", "AUTHORS", "CONTRIBUTING"
-    }
+    # Get modified files, with git's binary detection
+    changes = _diff_numstat(cwd)
 
     allowlist = task.get("files_allowlist", [])
+    allowed_files = frozenset(a for a in allowlist if not a.endswith("/"))
+    allowed_dirs = tuple(a for a in allowlist if a.endswith("/"))
 
     def is_allowed(filepath: str) -> bool:
         """Check if file is allowed (exact match or under allowed directory)."""
-        for allowed in allowlist:
-            if allowed.endswith("/"):
-                if filepath.startswith(allowed):
-                    return True
-            else:
-                if filepath == allowed:
-                    return True
-        return False
+        return filepath in allowed_files or filepath.startswith(allowed_dirs)
 
     files_modified = []
     unauthorized_files = []
+    binary_files = []
 
-    for f in git_result.stdout.strip().split("\n"):
-        if not f or f.startswith(".spec2pr"):
+    for f, lines_changed in changes.items():
+        if f.startswith(".spec2pr"):
             continue
 
         basename = f.split("/")[-1]
-        if "." not in basename and basename not in KNOWN_TEXT_FILES:
-            check = subprocess.run(
-                ["file", "--mime", f],
-                capture_output=True,
-                text=True,
-            )
-            if "executable" in check.stdout or "binary" in check.stdout:
-                subprocess.run(["git", "checkout", "--", f], capture_output=True)
-                continue
+        if "." not in basename and basename not in KNOWN_TEXT_FILES and lines_changed is None:
+            binary_files.append(f)
+            continue
 
         if is_allowed(f):
             files_modified.append(f)
@@ -263,8 +284,7 @@ Implement this task now. Only modify files in the allowlist.
 
     if unauthorized_files:
         print(f"Reverting unauthorized file changes: {unauthorized_files}", file=sys.stderr)
-        for f in unauthorized_files:
-            subprocess.run(["git", "checkout", "--", f], capture_output=True)
+    _revert_files(binary_files + unauthorized_files, cwd)
 
     return {
         "success": True,
@@ -274,20 +294,28 @@ Implement this task now. Only modify files in the allowlist.
     }
 
 
-def _execute_task(task: dict, model: str, previous_failures: str | None = None) -> dict:
+def _execute_task(
+    task: dict,
+    task_json: str,
+    model: str,
+    previous_failures: str | None = None,
+    cwd: str | None = None
+) -> dict:
     """
     Execute a single attempt at implementing a task.
 
     Args:
         task: Task dict matching task.schema.json
+        task_json: Task serialized for the prompt
         model: Model to use (haiku, sonnet, opus)
         previous_failures: Context from previous failed attempts
+        cwd: Working tree to run in
 
     Returns:
         Result dict with success status, files_modified, summary, error
     """
     # Read the worker prompt
-    prompt = WORKER_PROMPT.read_text()
+    prompt = load_prompt(WORKER_PROMPT)
 
     # Build previous failures section if retrying
     retry_context = ""
@@ -309,24 +337,24 @@ The following attempts have already failed. Learn from these errors and try a di
 ## Task to implement
 
 ```json
-{json.dumps(task, indent=2)}
+{task_json}
 ```
 
 Implement this task now. Only modify files in the allowlist.
 """
 
     # Run Claude Code headlessly
-    result = subprocess.run(
+    result = run_claude(
         [
             "claude",
             "--print",
             "--dangerously-skip-permissions",
             "--allowedTools", "Read,Edit,Bash",
             "--model", model,
-            "-p", full_prompt,
         ],
-        capture_output=True,
-        text=True,
+        full_prompt,
+        WORKER_TIMEOUT_SECONDS,
+        cwd,
     )
 
     if result.returncode != 0:
@@ -343,56 +371,35 @@ Implement this task now. Only modify files in the allowlist.
             "claude_output": result.stdout[:2000],
         }
 
-    # Get list of modified files (excluding .spec2pr directory and binaries)
-    git_result = subprocess.run(
-        ["git", "diff", "--name-only"],
-        capture_output=True,
-        text=True,
-    )
-
-    # Known non-binary files without extensions
-    KNOWN_TEXT_FILES = {
-        "Makefile", "Dockerfile", "Vagrantfile", "Gemfile", "Rakefile",
-        "LICENSE", "README", "CHANGELOG", "AUTHORS", "CONTRIBUTING"
-    }
+    # Get modified files with their line counts (excluding .spec2pr directory and binaries)
+    changes = _diff_numstat(cwd)
 
     # Get allowlist from task
+    # Split the allowlist once: exact files for set lookup, and directory
+    # prefixes for a single startswith() over the whole tuple
     allowlist = task.get("files_allowlist", [])
+    allowed_files = frozenset(a for a in allowlist if not a.endswith("/"))
+    allowed_dirs = tuple(a for a in allowlist if a.endswith("/"))
 
     def is_allowed(filepath: str) -> bool:
         """Check if file is allowed (exact match or under allowed directory)."""
-        for allowed in allowlist:
-            if allowed.endswith("/"):
-                # Directory prefix match
-                if filepath.startswith(allowed):
-                    return True
-            else:
-                # Exact file match
-                if filepath == allowed:
-                    return True
-        return False
+        return filepath in allowed_files or filepath.startswith(allowed_dirs)
 
     all_modified = []
     files_modified = []
     unauthorized_files = []
+    binary_files = []
 
-    for f in git_result.stdout.strip().split("\n"):
-        if not f or f.startswith(".spec2pr"):
+    for f, lines_changed in changes.items():
+        if f.startswith(".spec2pr"):
             continue
 
-        # Check if file might be a binary (no extension and not a known text file)
+        # Binaries (no extension, not a known text file, and no line counts
+        # from git) are reverted silently
         basename = f.split("/")[-1]
-        if "." not in basename and basename not in KNOWN_TEXT_FILES:
-            # Check if it's actually a binary
-            check = subprocess.run(
-                ["file", "--mime", f],
-                capture_output=True,
-                text=True,
-            )
-            if "executable" in check.stdout or "binary" in check.stdout:
-                # Revert binary files silently
-                subprocess.run(["git", "checkout", "--", f], capture_output=True)
-                continue
+        if "." not in basename and basename not in KNOWN_TEXT_FILES and lines_changed is None:
+            binary_files.append(f)
+            continue
 
         all_modified.append(f)
 
@@ -402,21 +409,19 @@ Implement this task now. Only modify files in the allowlist.
         else:
             unauthorized_files.append(f)
 
-    # Revert unauthorized file changes to keep the task focused
+    # Revert binaries and unauthorized file changes to keep the task focused
     if unauthorized_files:
         print(f"Reverting unauthorized file changes: {unauthorized_files}", file=sys.stderr)
-        for f in unauthorized_files:
-            subprocess.run(["git", "checkout", "--", f], capture_output=True)
+    _revert_files(binary_files + unauthorized_files, cwd)
 
     # Check LOC cap if specified
     loc_cap = task.get("loc_cap", 300)
-    loc_count = _count_changed_lines(files_modified)
+    loc_count = _count_changed_lines(files_modified, changes)
 
     if loc_count > loc_cap:
         # Revert all changes to allowed files
         print(f"LOC cap exceeded: {loc_count} lines > {loc_cap} limit", file=sys.stderr)
-        for f in files_modified:
-            subprocess.run(["git", "checkout", "--", f], capture_output=True)
+        _revert_files(files_modified, cwd)
 
         return {
             "task_id": task["id"],
@@ -436,42 +441,61 @@ Implement this task now. Only modify files in the allowlist.
     }
 
 
-def _count_changed_lines(files: list[str]) -> int:
+def _revert_files(files: list[str], cwd: str | None = None) -> None:
     """
-    Count total lines added/deleted in the given files using git diff --stat.
+    Discard working tree changes to files, with one `git checkout` per REVERT_BATCH_SIZE paths.
 
     Args:
-        files: List of file paths to count changes in
+        files: File paths to revert
+        cwd: Working tree to revert in
+    """
+    for start in range(0, len(files), REVERT_BATCH_SIZE):
+        subprocess.run(
+            ["git", "checkout", "--"] + files[start:start + REVERT_BATCH_SIZE],
+            capture_output=True,
+            cwd=cwd,
+        )
 
-    Returns:
-        Total number of lines changed (additions + deletions)
+
+def _diff_numstat(cwd: str | None = None) -> dict[str, int | None]:
     """
-    if not files:
-        return 0
+    List modified files with one `git diff --numstat` call.
 
+    Args:
+        cwd: Working tree to diff
+
+    Returns:
+        Map of file path to lines changed (additions + deletions), or None
+        for files git considers binary
+    """
+    # -z emits paths verbatim (no C-style quoting of unusual names) and
+    # NUL-terminates records; --no-renames keeps one path per record
     result = subprocess.run(
-        ["git", "diff", "--stat"] + files,
+        ["git", "diff", "--numstat", "-z", "--no-renames"],
         capture_output=True,
         text=True,
+        cwd=cwd,
     )
 
-    total_lines = 0
-    # Parse output format: "filename | X insertions(+), Y deletions(-)"
-    for line in result.stdout.strip().split("\n"):
-        if not line or line.startswith(" "):
+    changes = {}
+    # Record format: "<added>\t<deleted>\t<path>", with "-" counts for binaries
+    for record in result.stdout.split("\0"):
+        if not record:
             continue
-        # Extract the number part after the pipe character
-        if "|" in line:
-            stats = line.split("|")[1].strip()
-            # Parse insertions/deletions counts
-            parts = stats.split()
-            for i, part in enumerate(parts):
-                if "insertion" in part or "deletion" in part:
-                    # Get the number before the word
-                    if i > 0:
-                        try:
-                            total_lines += int(parts[i - 1])
-                        except ValueError:
-                            pass
-
-    return total_lines
+        added, deleted, path = record.split("\t", 2)
+        changes[path] = None if added == "-" else int(added) + int(deleted)
+    return changes
+
+
+def _count_changed_lines(files: list[str], changes: dict[str, int | None]) -> int:
+    """
+    Count total lines added/deleted in the given files.
+
+    Args:
+        files: List of file paths to count changes in
+        changes: Per-file line counts from _diff_numstat()
+
+    Returns:
+        Total number of lines changed (additions + deletions)
+    """
+    return sum(changes.get(f) or 0 for f in files)
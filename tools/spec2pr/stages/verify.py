@@ -1,13 +1,50 @@
 """Verify stage - runs CI to verify task completion."""
 
+import os
+import re
+import shlex
+import shutil
+import signal
 import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import IO
+
+from adapters.fs import ensure_dir
+from adapters.github import working_tree_hash
+from stages.cache import cache_enabled, cache_get, cache_key, cache_put
+from stages.process import run_in_session
+
+
+# Characters /bin/sh would interpret; commands containing any run through a shell
+_RE_SHELL_SYNTAX = re.compile(r"[|&;<>()$`\\*?\[\]{}~#!\n]")
+
+# Files suggested when a task's allowlist has invalid paths: the scan stops
+# after this many, and skips these directories entirely
+SUGGESTION_SCAN_LIMIT = 50
+SUGGESTION_EXCLUDED_DIRS = frozenset({".git", ".spec2pr", "__pycache__", "node_modules"})
+SUGGESTION_EXTENSIONS = frozenset({".py", ".json", ".md", ".sh", ".yml", ".yaml"})
+
+# Default limit on a single done_when command; tasks override it with timeout_sec
+COMMAND_TIMEOUT_SECONDS = 600
+
+# Deterministic checks run before AI review, by result category
+DETERMINISTIC_CHECKS = {
+    "linting": ["python", "-m", "pylint", "--errors-only", "tools/spec2pr"],
+    "type_checking": ["python", "-m", "mypy", "tools/spec2pr", "--ignore-missing-imports"],
+    "tests": ["python", "-m", "pytest", "-v"],
+}
 
 
 def run_deterministic_checks() -> dict:
     """
     Run deterministic checks (linting, type checking, tests) before AI review.
 
+    The checks are independent processes, so they run concurrently, each
+    with its own captured output.
+
     Returns:
         Dict with categorized check results:
         {
@@ -16,48 +53,34 @@ def run_deterministic_checks() -> dict:
             "tests": {"passed": bool, "output": str}
         }
     """
-    results = {
-        "linting": {"passed": True, "output": ""},
-        "type_checking": {"passed": True, "output": ""},
-        "tests": {"passed": True, "output": ""},
-    }
-
-    # Run linting with pylint
-    lint_result = subprocess.run(
-        ["python", "-m", "pylint", "--errors-only", "tools/spec2pr"],
-        capture_output=True,
-        text=True,
-    )
-    results["linting"]["output"] = lint_result.stdout + lint_result.stderr
-    results["linting"]["passed"] = lint_result.returncode == 0
+    with ThreadPoolExecutor(max_workers=len(DETERMINISTIC_CHECKS)) as executor:
+        futures = {
+            name: executor.submit(_run_check, cmd)
+            for name, cmd in DETERMINISTIC_CHECKS.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
 
-    # Run type checking with mypy
-    type_result = subprocess.run(
-        ["python", "-m", "mypy", "tools/spec2pr", "--ignore-missing-imports"],
-        capture_output=True,
-        text=True,
-    )
-    results["type_checking"]["output"] = type_result.stdout + type_result.stderr
-    results["type_checking"]["passed"] = type_result.returncode == 0
 
-    # Run tests with pytest
-    test_result = subprocess.run(
-        ["python", "-m", "pytest", "-v"],
+def _run_check(cmd: list[str]) -> dict:
+    """Run one check command, returning {"passed": bool, "output": str}."""
+    result = subprocess.run(
+        cmd,
         capture_output=True,
         text=True,
     )
-    results["tests"]["output"] = test_result.stdout + test_result.stderr
-    results["tests"]["passed"] = test_result.returncode == 0
-
-    return results
+    return {
+        "passed": result.returncode == 0,
+        "output": result.stdout + result.stderr,
+    }
 
 
-def validate_files_allowlist(task: dict) -> dict | None:
+def validate_files_allowlist(task: dict, cwd: str | None = None) -> dict | None:
     """
     Validate that files_allowlist paths exist or could be created.
 
     Args:
         task: Task dict with files_allowlist
+        cwd: Repository root to resolve paths against (defaults to current dir)
 
     Returns:
         None if valid, or failure dict if invalid paths found
@@ -66,9 +89,10 @@ def validate_files_allowlist(task: dict) -> dict | None:
     if not allowlist:
         return None
 
+    root = Path(cwd or ".")
     invalid_paths = []
     for path_str in allowlist:
-        path = Path(path_str)
+        path = root / path_str
         # Path is valid if it exists OR its parent directory exists (can be created)
         if not path.exists() and not path.parent.exists():
             invalid_paths.append(path_str)
@@ -77,20 +101,14 @@ def validate_files_allowlist(task: dict) -> dict | None:
         return None
 
     # Suggest actual paths from codebase
-    cwd = Path(".")
-    available = []
-    for item in cwd.rglob("*"):
-        if any(p in item.parts for p in [".git", ".spec2pr", "__pycache__", "node_modules"]):
-            continue
-        if item.is_file() and item.suffix in [".py", ".json", ".md", ".sh", ".yml", ".yaml"]:
-            available.append(str(item))
-    available.sort()
+    available = _suggestion_files(root)
 
     suggestion = ""
     if available:
         suggestion = "\n\nAvailable files:\n  " + "\n  ".join(available[:15])
         if len(available) > 15:
-            suggestion += f"\n  ... and {len(available) - 15} more"
+            at_limit = "+" if len(available) >= SUGGESTION_SCAN_LIMIT else ""
+            suggestion += f"\n  ... and {len(available) - 15}{at_limit} more"
 
     return {
         "passed": False,
@@ -100,26 +118,73 @@ def validate_files_allowlist(task: dict) -> dict | None:
     }
 
 
-def verify(task: dict) -> dict:
+def _suggestion_files(root: Path) -> list[str]:
+    """
+    Collect up to SUGGESTION_SCAN_LIMIT suggestable files under root.
+
+    Walks depth-first in name order with os.scandir (a directory's files
+    before its subdirectories), never descending into
+    SUGGESTION_EXCLUDED_DIRS, and stops as soon as the limit is reached.
+
+    Args:
+        root: Repository root
+
+    Returns:
+        Paths relative to root, in walk order
+    """
+    found = []
+    stack = [("", str(root))]
+    while stack:
+        prefix, path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name, reverse=True)
+        except OSError:
+            continue
+
+        # Reverse order on the stack, so directories pop in name order
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SUGGESTION_EXCLUDED_DIRS:
+                    stack.append((f"{prefix}{entry.name}/", entry.path))
+        for entry in reversed(entries):
+            if entry.is_file() and os.path.splitext(entry.name)[1] in SUGGESTION_EXTENSIONS:
+                found.append(prefix + entry.name)
+                if len(found) >= SUGGESTION_SCAN_LIMIT:
+                    return found
+    return found
+
+
+def verify(task: dict, cwd: str | None = None, artifacts_dir: Path | None = None) -> dict:
     """
     Run verification commands for a task.
 
     Args:
         task: Task dict with done_when commands
+        cwd: Working tree to verify (defaults to current dir)
+        artifacts_dir: Directory for this task's ci.log (defaults to
+            .spec2pr/artifacts/<task id>)
 
     Returns:
         Verify dict matching verify.schema.json
     """
     # Validate file paths first
-    path_error = validate_files_allowlist(task)
+    path_error = validate_files_allowlist(task, cwd)
     if path_error:
         return path_error
 
+    root = Path(cwd or ".")
     commands = task.get("done_when", [])
 
+    # A command listed twice would run the whole check twice
+    unique_commands = list(dict.fromkeys(commands))
+    if len(unique_commands) < len(commands):
+        print(f"Warning: {task['id']} lists duplicate done_when commands; running each once", file=sys.stderr)
+        commands = unique_commands
+
     # If no done_when commands, check for ci.sh
     if not commands:
-        ci_script = Path("ci.sh")
+        ci_script = root / "ci.sh"
         if ci_script.exists():
             commands = ["./ci.sh"]
         else:
@@ -135,7 +200,7 @@ def verify(task: dict) -> dict:
     valid_commands = []
     for cmd in commands:
         # Check if it's a script reference that doesn't exist
-        if cmd.startswith("./") and not Path(cmd.lstrip("./").split()[0]).exists():
+        if cmd.startswith("./") and not (root / cmd.lstrip("./").split()[0]).exists():
             continue
         valid_commands.append(cmd)
 
@@ -147,35 +212,208 @@ def verify(task: dict) -> dict:
             "summary": f"Skipped verification (scripts not found: {commands})",
         }
 
-    logs = []
-    all_passed = True
+    logs_path = (artifacts_dir or Path(f".spec2pr/artifacts/{task['id']}")) / "ci.log"
+    ensure_dir(logs_path.parent)
+
+    # With caching on, a tree that already passed these commands isn't
+    # re-verified; tasks whose checks depend on more than the tree (network,
+    # services, time) opt out with no_cache
+    key = None
+    if cache_enabled() and not task.get("no_cache", False):
+        key = cache_key(commands, working_tree_hash(cwd))
+        cached = cache_get("verify", key)
+        if cached is not None:
+            _write_cached_log(logs_path, cached.get("logs_path", ""))
+            return {**cached, "logs_path": str(logs_path), "cached": True}
+
+    # Stream each command's output straight into the log file as it runs,
+    # rather than buffering it in memory until the command exits; a long CI
+    # run can be followed with tail -f
+
+    # done_when is expected cheapest-first, so once a command fails the
+    # slower ones after it aren't worth starting
+    fail_fast = not task.get("continue_on_error", False)
+    timeout = task.get("timeout_sec", COMMAND_TIMEOUT_SECONDS)
+
+    with logs_path.open("w") as log_file:
+        # Commands may depend on earlier ones (build, then test), so they
+        # only run concurrently when the task says they are independent
+        if task.get("parallel", False) and len(valid_commands) > 1:
+            returncodes = _run_commands_parallel(valid_commands, log_file, cwd, fail_fast, timeout)
+        else:
+            returncodes = []
+            for i, cmd in enumerate(valid_commands):
+                if i:
+                    log_file.write("\n")
+                log_file.write(f"$ {cmd}\n")
+                if fail_fast and any(returncode != 0 for returncode in returncodes):
+                    log_file.write("SKIPPED (fail-fast)\n")
+                    continue
+                # Flush so our header lands before the child's output in the shared file
+                log_file.flush()
+
+                returncode = _run_command(cmd, log_file, cwd, timeout)
+                returncodes.append(returncode)
+
+                if returncode != 0:
+                    log_file.write(f"EXIT CODE: {returncode}\n")
+
+    all_passed = all(returncode == 0 for returncode in returncodes)
+    verify_result = {
+        "passed": all_passed,
+        "commands": commands,
+        "logs_path": str(logs_path),
+        "summary": "All checks passed" if all_passed else "Some checks failed",
+    }
+    # Only passes are cached, so a flaky failure is always retried
+    if key is not None and all_passed:
+        cache_put("verify", key, verify_result)
+    return verify_result
+
 
-    for cmd in valid_commands:
-        logs.append(f"$ {cmd}")
+def _write_cached_log(logs_path: Path, source: str) -> None:
+    """
+    Write this task's ci.log for a verify cache hit.
 
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
+    The cached result points at the log of the run that produced it, which may
+    belong to another task or have been cleaned up since, so its contents are
+    copied here when still available.
 
-        logs.append(result.stdout)
-        if result.stderr:
-            logs.append(f"STDERR: {result.stderr}")
+    Args:
+        logs_path: This task's ci.log
+        source: logs_path recorded in the cached result
+    """
+    header = "CACHED: these commands already passed on an identical working tree\n"
+    try:
+        original = Path(source).read_text() if source else ""
+    except OSError:
+        original = ""
+    if original:
+        header += f"Log of that run ({source}):\n\n"
+    logs_path.write_text(header + original)
+
+
+def _run_commands_parallel(
+    commands: list[str],
+    log_file: IO[str],
+    cwd: str | None = None,
+    fail_fast: bool = False,
+    timeout: float | None = None,
+) -> list[int | None]:
+    """
+    Run verification commands concurrently, logging their output in command order.
 
-        if result.returncode != 0:
-            all_passed = False
-            logs.append(f"EXIT CODE: {result.returncode}")
+    Each command writes to its own temp file while it runs; once all have
+    finished, the outputs are appended to log_file in the same layout the
+    serial loop produces.
 
-    # Write logs to file
-    logs_path = Path(f".spec2pr/artifacts/{task['id']}/ci.log")
-    logs_path.parent.mkdir(parents=True, exist_ok=True)
-    logs_path.write_text("\n".join(logs))
+    Args:
+        commands: Command lines to run
+        log_file: Open file receiving every command's output
+        cwd: Working directory for the commands
+        fail_fast: Don't start queued commands once one has failed
+        timeout: Seconds each command may run before it is killed
 
-    return {
-        "passed": all_passed,
-        "commands": commands,
-        "logs_path": str(logs_path),
-        "summary": "All checks passed" if all_passed else "Some checks failed",
-    }
+    Returns:
+        Exit codes in command order, None for commands skipped by fail_fast
+    """
+    outputs = [tempfile.TemporaryFile("w+", errors="replace") for _ in commands]
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(commands), os.cpu_count() or 4)) as executor:
+            futures = [
+                executor.submit(_run_command, cmd, output, cwd, timeout)
+                for cmd, output in zip(commands, outputs)
+            ]
+            if fail_fast:
+                for future in as_completed(futures):
+                    if future.result() != 0:
+                        # Commands already running are left to finish
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        returncodes = [None if future.cancelled() else future.result() for future in futures]
+
+        for i, (cmd, output, returncode) in enumerate(zip(commands, outputs, returncodes)):
+            if i:
+                log_file.write("\n")
+            log_file.write(f"$ {cmd}\n")
+            if returncode is None:
+                log_file.write("SKIPPED (fail-fast)\n")
+                continue
+            output.seek(0)
+            shutil.copyfileobj(output, log_file)
+            if returncode != 0:
+                log_file.write(f"EXIT CODE: {returncode}\n")
+    finally:
+        for output in outputs:
+            output.close()
+    return returncodes
+
+
+def _run_command(cmd: str, log_file: IO[str], cwd: str | None = None, timeout: float | None = None) -> int:
+    """
+    Run a verification command, exec'ing it directly when it needs no shell.
+
+    Plain commands (no shell syntax, no leading VAR=value) are split with
+    shlex and run without the extra /bin/sh process. Anything else - or a
+    direct exec that fails, e.g. a shell builtin or a script without a
+    shebang - runs through the shell as before.
+
+    Args:
+        cmd: Command line from done_when
+        log_file: Open file receiving stdout and stderr
+        cwd: Working directory for the command
+        timeout: Seconds to wait before killing the command
+
+    Returns:
+        The command's exit code
+    """
+    if not _RE_SHELL_SYNTAX.search(cmd):
+        try:
+            argv = shlex.split(cmd)
+        except ValueError:
+            argv = []
+        if argv and "=" not in argv[0]:
+            try:
+                return _run_process(argv, log_file, cwd, timeout)
+            except OSError:
+                pass
+
+    return _run_process(cmd, log_file, cwd, timeout, shell=True)
+
+
+def _run_process(
+    args: str | list[str],
+    log_file: IO[str],
+    cwd: str | None,
+    timeout: float | None,
+    shell: bool = False,
+) -> int:
+    """
+    Run a process, killing its whole process group on timeout.
+
+    A plain kill would only reach the direct child, leaving e.g. the test
+    runner that ./ci.sh started holding the log open.
+
+    Args:
+        args: argv list, or a command line when shell is True
+        log_file: Open file receiving stdout and stderr
+        cwd: Working directory for the process
+        timeout: Seconds to wait before killing the process group
+        shell: Run args through /bin/sh
+
+    Returns:
+        The process's exit code
+    """
+    try:
+        return run_in_session(
+            args,
+            timeout=timeout,
+            shell=shell,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            cwd=cwd,
+        ).returncode
+    except subprocess.TimeoutExpired:
+        log_file.write(f"TIMEOUT after {timeout}s\n")
+        return -signal.SIGKILL